@@ -1,28 +1,55 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, send_file
-import json
+from flask import Flask, Response, g, render_template, request, redirect, url_for, session, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 import os
 import csv
-import requests
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import io
 import threading
 import time
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib import colors
+import tempfile
+# pdf_reports (ReportLab) and requests are imported by the routes and threads
+# that use them, so worker startup and the other routes do not load them
+from pdf_cache import pdf_cache, PDF_CACHE_ENABLED
+from jobs import job_runner, register_job
+from search_index import search_index, SEARCH_INDEX_ENABLED
+import http_cache
+import compression
 
 # Import Supabase database functions
 from db import (
     get_all_users, get_user, create_user, update_user, delete_user,
-    get_all_candidates, get_candidate, create_candidate,
+    get_all_candidates, get_candidate,
+    get_candidate_ids, bulk_create_candidates,
+    get_candidates_page, get_candidate_departments, CANDIDATES_PAGE_SIZE,
     get_all_checklists, get_checklist, save_checklist,
-    init_default_user as db_init_default_user
+    get_dashboard_stats, get_cache_stats, get_backend_status, run_parallel,
+    add_change_listener, init_default_user as db_init_default_user, REQUEST_RETRY_BUDGET
 )
+from resilience import start_request_budget, end_request_budget
+from records import Record
+from geoip import geolocator, client_ip, GEOIP_ENABLED, PENDING as GEO_PENDING, UNKNOWN as GEO_UNKNOWN
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """JSON for db records (jsonify, |tojson) as plain objects"""
+    @staticmethod
+    def default(o):
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
+# url_for('static', ...) carries a content hash; those URLs are cached for a year
+http_cache.init_app(app)
+# gzip/brotli for HTML, JSON and CSV bodies; static files use precompressed copies
+compression.init_app(app)
+
+# Rendered PDFs of a candidate are dropped whenever its rows change
+add_change_listener(pdf_cache.on_change)
+# ... and the search index refreshes it before the next query
+add_change_listener(search_index.on_change)
 # Use environment variable for secret key in production, fallback for development
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'gdg_kare_2026_secret_key_change_in_production')
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -36,27 +63,36 @@ os.makedirs('templates', exist_ok=True)
 
 # Using Supabase database for all data storage
 
-def format_positions(value):
-    """Convert JSON string positions to comma-separated string"""
-    if not value:
-        return value
-    try:
-        # Try to parse as JSON if it's a JSON string
-        if isinstance(value, str) and value.strip().startswith('['):
-            positions = json.loads(value)
-            if isinstance(positions, list):
-                return ', '.join(positions)
-        # If it's already a list, join it
-        elif isinstance(value, list):
-            return ', '.join(value)
-        # Otherwise return as is
-        return value
-    except (json.JSONDecodeError, TypeError):
-        # If parsing fails, return original value
-        return value
-
-# Register Jinja2 filter
-app.jinja_env.filters['format_positions'] = format_positions
+# Compiled templates are kept on disk, so new and recycled workers load them
+# instead of compiling every template again (stale entries are recompiled)
+TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', os.path.join('data', 'template_cache'))
+if TEMPLATE_CACHE_DIR:
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+def warm_up_templates():
+    """Compile every template now; with gunicorn's preload_app this runs in
+    the master, and forked workers start with the templates loaded"""
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+@app.before_request
+def start_job_workers():
+    """Job threads run in the processes that serve requests (not in a
+    preloading gunicorn master); starting is a no-op after the first time"""
+    job_runner.start()
+
+@app.before_request
+def start_retry_budget():
+    """Database retries of this request share one budget, so several slow
+    reads cannot add up past the worker timeout"""
+    g.retry_budget = start_request_budget(REQUEST_RETRY_BUDGET)
+
+@app.teardown_request
+def end_retry_budget(exc):
+    token = g.pop('retry_budget', None)
+    if token is not None:
+        end_request_budget(token)
 
 def keep_alive_ping():
     """Background thread that pings a URL every 11 minutes to keep the service alive"""
@@ -76,8 +112,10 @@ def keep_alive_ping():
     print(f"Keep-alive thread started. Will ping {ping_url} every {ping_interval // 60} minutes")
     
     while True:
+        time.sleep(ping_interval)
+        # Imported after the first interval, not while the worker starts
+        import requests
         try:
-            time.sleep(ping_interval)
             response = requests.get(ping_url, timeout=10)
             print(f"[Keep-Alive] Pinged {ping_url} - Status: {response.status_code} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         except requests.exceptions.RequestException as e:
@@ -114,45 +152,44 @@ def login():
         user = get_user(user_id)
         
         if user and user['passcode'] == passcode:
-            # Get IP address
-            ip_address = request.remote_addr
-            if request.headers.get('X-Forwarded-For'):
-                ip_address = request.headers.get('X-Forwarded-For').split(',')[0].strip()
-            
-            # Fetch IP geolocation info
-            location_info = {'ip': ip_address, 'location': 'Unknown', 'isp': 'Unknown'}
-            try:
-                # Using ip-api.com (free, no API key required)
-                response = requests.get(f'http://ip-api.com/json/{ip_address}?fields=status,country,regionName,city,isp,query', timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('status') == 'success':
-                        city = data.get('city', '')
-                        region = data.get('regionName', '')
-                        country = data.get('country', '')
-                        location_parts = [p for p in [city, region, country] if p]
-                        location_info['location'] = ', '.join(location_parts) if location_parts else 'Unknown'
-                        location_info['isp'] = data.get('isp', 'Unknown')
-                        location_info['ip'] = data.get('query', ip_address)
-            except:
-                pass  # If API fails, use defaults
+            # Location comes from the per-IP cache; otherwise it is looked up
+            # in the background and written to the user when resolved
+            ip_address = client_ip(request)
+            location_info = geolocator.cached(ip_address)
+            login_written = threading.Event()
+            if location_info is None:
+                # Queued first so a full queue is recorded as Unknown in the same
+                # write; the worker stores its result only after that write
+                if GEOIP_ENABLED and geolocator.submit(user_id, ip_address, login_written):
+                    location_info = {'ip': ip_address, 'location': GEO_PENDING, 'isp': GEO_PENDING}
+                else:
+                    location_info = {'ip': ip_address, 'location': GEO_UNKNOWN, 'isp': GEO_UNKNOWN}
             
             # Update last login and location info
-            update_user(user_id, {
-                'last_login': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'ip_address': location_info['ip'],
-                'location': location_info['location'],
-                'isp': location_info['isp']
-            })
+            login_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            try:
+                update_user(user_id, {
+                    'last_login': login_time,
+                    'ip_address': location_info['ip'],
+                    'location': location_info['location'],
+                    'isp': location_info['isp']
+                })
+            finally:
+                login_written.set()
             
             # Set session with role and name
             session['user_id'] = user_id
             session['role'] = user.get('role', 'admin')
             session['name'] = user.get('name', user_id)
-            session['last_login'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            session['last_login'] = login_time
             session['ip_address'] = location_info['ip']
-            session['location'] = location_info['location']
-            session['isp'] = location_info['isp']
+            # A pending location is left out so the dashboard reads the resolved one
+            if location_info['location'] != GEO_PENDING:
+                session['location'] = location_info['location']
+                session['isp'] = location_info['isp']
+            else:
+                session.pop('location', None)
+                session.pop('isp', None)
             
             return redirect(url_for('dashboard'))
         else:
@@ -172,40 +209,33 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    users = get_all_users()
-    candidates = get_all_candidates()
-    checklists = get_all_checklists()
-    
     user_id = session['user_id']
     user_role = session.get('role', 'admin')
     user_name = session.get('name', user_id)
-    user_data = users.get(user_id, {})
-    last_login = session.get('last_login') or user_data.get('last_login', 'First login')
     current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
+    # Only fall back to the users table when the session lacks login details;
+    # statistics are counted in the database and for faculty describe reviews
+    if all(session.get(key) for key in ('last_login', 'ip_address', 'location', 'isp')):
+        user_data, stats = {}, get_dashboard_stats(user_role)
+    else:
+        stats, user_data = run_parallel(lambda: get_dashboard_stats(user_role),
+                                        lambda: get_user(user_id) or {})
+    last_login = session.get('last_login') or user_data.get('last_login', 'First login')
+    
+    # Keep a resolved login location so later visits skip the users table
+    if user_data.get('location') and user_data['location'] != GEO_PENDING:
+        session['location'] = user_data['location']
+        session['isp'] = user_data.get('isp') or 'Unknown'
+    
     # Get IP, location, ISP from session or user data
     ip_address = session.get('ip_address') or user_data.get('ip_address', 'Unknown')
     location = session.get('location') or user_data.get('location', 'Unknown')
     isp = session.get('isp') or user_data.get('isp', 'Unknown')
     
-    # Calculate statistics based on user role
-    if user_role == 'faculty_reviewer':
-        # For faculty: count candidates with checklists that have faculty reviews
-        total_with_checklists = len(checklists)  # Total candidates with checklists
-        reviewed_by_faculty = sum(1 for c in checklists.values() 
-                                 if c.get('faculty_comments') and 
-                                 c.get('faculty_comments', '').strip() != '')
-        pending_faculty_reviews = total_with_checklists - reviewed_by_faculty
-        
-        # Faculty-specific statistics
-        total_candidates = total_with_checklists
-        total_checklists = reviewed_by_faculty
-        pending_checklists = pending_faculty_reviews
-    else:
-        # For admin and interviewer: show general statistics
-        total_candidates = len(candidates)
-        total_checklists = len(checklists)
-        pending_checklists = total_candidates - total_checklists
+    total_candidates = stats['total']
+    total_checklists = stats['completed']
+    pending_checklists = stats['pending']
     
     return render_template('dashboard.html', 
                          user_id=user_id,
@@ -303,6 +333,94 @@ def manage_users():
     
     return render_template('manage_users.html', users=users)
 
+@app.route('/system_stats')
+def system_stats():
+    """Admin-only JSON counters for monitoring the data layer"""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    if session.get('role') != 'admin':
+        return redirect(url_for('dashboard'))
+    
+    return jsonify({
+        'pid': os.getpid(),
+        'cache': get_cache_stats(),
+        'backend': get_backend_status(),
+        'geoip': geolocator.status(),
+        'pdf_cache': pdf_cache.status(),
+        'jobs': job_runner.status(),
+        'search_index': search_index.status()
+    })
+
+class ImportCSVError(ValueError):
+    """The uploaded CSV cannot be imported as a whole"""
+
+def import_candidates_csv(csv_text: str, progress=None) -> dict:
+    """Import candidates from CSV text, skipping register_ids that already exist.
+    
+    Returns {'imported': n, 'skipped': n, 'message': str, 'errors': [str, ...]};
+    `progress(done, total)` is passed on to bulk_create_candidates.
+    """
+    stream = io.StringIO(csv_text, newline=None)
+    csv_reader = csv.DictReader(stream)
+    
+    required_columns = ['Register ID', 'Candidate Name', 'Department', 'Position Applied', 
+                      'Day Scholar / Hosteler', 'Phone Number', 'LinkedIn Profile', 'GitHub Profile']
+    
+    # Validate columns
+    if not csv_reader.fieldnames or not all(col in csv_reader.fieldnames for col in required_columns):
+        raise ImportCSVError(f'Missing required columns. Required: {", ".join(required_columns)}')
+    
+    existing_ids = get_candidate_ids()
+    skipped = 0
+    errors = []
+    new_candidates = []
+    
+    for row in csv_reader:
+        register_id = row['Register ID'].strip()
+        
+        if not register_id:
+            skipped += 1
+            continue
+        
+        if register_id in existing_ids:
+            skipped += 1
+            errors.append(f"Register ID {register_id} already exists")
+            continue
+        # Repeated rows within the same file count as duplicates too
+        existing_ids.add(register_id)
+        
+        # Handle empty day_scholar_hosteler - set to NULL if empty
+        day_scholar_hosteler = row['Day Scholar / Hosteler'].strip()
+        if not day_scholar_hosteler:
+            day_scholar_hosteler = None
+        
+        new_candidates.append({
+            'register_id': register_id,
+            'candidate_name': row['Candidate Name'].strip(),
+            'department': row['Department'].strip(),
+            'position_applied': row['Position Applied'].strip(),
+            'day_scholar_hosteler': day_scholar_hosteler,
+            'phone_number': row['Phone Number'].strip(),
+            'linkedin_profile': row['LinkedIn Profile'].strip() or None,
+            'github_profile': row['GitHub Profile'].strip() or None,
+            'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    # Insert in chunks; the database skips rows created meanwhile
+    result = bulk_create_candidates(new_candidates, progress=progress)
+    imported = len(result['inserted'])
+    skipped += len(result['duplicates'])
+    for register_id in result['duplicates']:
+        errors.append(f"Register ID {register_id} already exists")
+    for register_id in result['failed']:
+        errors.append(f"Failed to import Register ID {register_id}")
+    
+    message = f'Successfully imported {imported} candidate(s).'
+    if skipped > 0:
+        message += f' Skipped {skipped} duplicate(s).'
+    return {'imported': imported, 'skipped': skipped, 'message': message, 'errors': errors}
+
 @app.route('/import_candidates', methods=['GET', 'POST'])
 def import_candidates():
     """Handle CSV import of candidates"""
@@ -324,63 +442,23 @@ def import_candidates():
             return render_template('import_candidates.html', error='Invalid file format. Please upload a CSV file.')
         
         try:
-            # Read CSV
-            stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
-            csv_reader = csv.DictReader(stream)
-            
-            required_columns = ['Register ID', 'Candidate Name', 'Department', 'Position Applied', 
-                              'Day Scholar / Hosteler', 'Phone Number', 'LinkedIn Profile', 'GitHub Profile']
-            
-            # Validate columns
-            if not all(col in csv_reader.fieldnames for col in required_columns):
-                return render_template('import_candidates.html', 
-                                     error=f'Missing required columns. Required: {", ".join(required_columns)}')
+            csv_text = file.stream.read().decode("UTF8")
             
-            candidates = get_all_candidates()
-            imported = 0
-            skipped = 0
-            errors = []
+            # Large files can be imported in the background; the page polls the job
+            if request.form.get('background'):
+                job_id = job_runner.new_job_id()
+                os.makedirs(job_runner.job_dir(job_id), exist_ok=True)
+                with open(os.path.join(job_runner.job_dir(job_id), 'candidates.csv'), 'w', encoding='utf-8') as f:
+                    f.write(csv_text)
+                job_runner.submit('import_candidates', owner=session['user_id'], job_id=job_id)
+                return render_template('import_candidates.html', job_id=job_id)
             
-            for row in csv_reader:
-                register_id = row['Register ID'].strip()
-                
-                if not register_id:
-                    skipped += 1
-                    continue
-                
-                if register_id in candidates:
-                    skipped += 1
-                    errors.append(f"Register ID {register_id} already exists")
-                    continue
-                
-                # Handle empty day_scholar_hosteler - set to NULL if empty
-                day_scholar_hosteler = row['Day Scholar / Hosteler'].strip()
-                if not day_scholar_hosteler:
-                    day_scholar_hosteler = None
-                
-                candidate_data = {
-                    'register_id': register_id,
-                    'candidate_name': row['Candidate Name'].strip(),
-                    'department': row['Department'].strip(),
-                    'position_applied': row['Position Applied'].strip(),
-                    'day_scholar_hosteler': day_scholar_hosteler,
-                    'phone_number': row['Phone Number'].strip(),
-                    'linkedin_profile': row['LinkedIn Profile'].strip() or None,
-                    'github_profile': row['GitHub Profile'].strip() or None,
-                    'imported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                if create_candidate(candidate_data):
-                    imported += 1
-                else:
-                    errors.append(f"Failed to import Register ID {register_id}")
-            
-            message = f'Successfully imported {imported} candidate(s).'
-            if skipped > 0:
-                message += f' Skipped {skipped} duplicate(s).'
-            
-            return render_template('import_candidates.html', success=message, errors=errors if errors else None)
+            result = import_candidates_csv(csv_text)
+            return render_template('import_candidates.html', success=result['message'],
+                                 errors=result['errors'] if result['errors'] else None)
         
+        except ImportCSVError as e:
+            return render_template('import_candidates.html', error=str(e))
         except Exception as e:
             return render_template('import_candidates.html', error=f'Error processing CSV: {str(e)}')
     
@@ -499,14 +577,106 @@ def view_candidates():
         return redirect(url_for('login'))
     
     user_role = session.get('role', 'admin')
-    candidates = get_all_candidates()
-    checklists = get_all_checklists()
     
-    # Add checklist status to each candidate
-    for register_id in candidates:
-        candidates[register_id]['has_checklist'] = register_id in checklists
+    # Filters and keyset cursors come from the query string
+    department = request.args.get('department', '').strip()
+    status = request.args.get('status', '').strip()
+    if status not in ('completed', 'pending'):
+        status = ''
+    search = request.args.get('search', '').strip()
     
-    return render_template('view_candidates.html', candidates=candidates, user_role=user_role)
+    after = request.args.get('after') or None
+    before = request.args.get('before') or None
+    limit = request.args.get('limit', CANDIDATES_PAGE_SIZE, type=int)
+    try:
+        page, departments = run_parallel(
+            lambda: get_candidates_page(after=after, before=before, limit=limit,
+                                        department=department or None, status=status or None,
+                                        search=search or None),
+            get_candidate_departments
+        )
+    except ValueError:
+        # Malformed cursor in a hand-edited URL: start from the first page
+        return redirect(url_for('view_candidates', department=department or None,
+                                status=status or None, search=search or None))
+    
+    return http_cache.conditional_page(
+        page['candidates'].values(),
+        lambda: render_template('view_candidates.html', candidates=page['candidates'],
+                                departments=departments,
+                                department=department, status=status, search=search,
+                                next_cursor=page['next_cursor'], prev_cursor=page['prev_cursor'],
+                                quick_find=SEARCH_INDEX_ENABLED, user_role=user_role),
+        request.query_string, departments, page['next_cursor'], page['prev_cursor'])
+
+@app.route('/api/candidates')
+def api_candidates():
+    """JSON page of candidates.
+    
+    Query parameters: search, department, position (one of the candidate's
+    positions, exactly), status (completed / pending), sort (register_id,
+    candidate_name or department, '-' prefix for descending), after / before
+    (cursors from a previous page) and limit.
+    Responses carry an ETag; a matching If-None-Match is answered with 304.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    status = request.args.get('status', '').strip()
+    if status and status not in ('completed', 'pending'):
+        return jsonify({'error': "status must be 'completed' or 'pending'"}), 400
+    query = {
+        'search': request.args.get('search', '').strip() or None,
+        'department': request.args.get('department', '').strip() or None,
+        'position': request.args.get('position', '').strip() or None,
+        'status': status or None,
+        'sort': request.args.get('sort', '').strip() or 'register_id'
+    }
+    try:
+        page = get_candidates_page(after=request.args.get('after') or None,
+                                   before=request.args.get('before') or None,
+                                   limit=request.args.get('limit', CANDIDATES_PAGE_SIZE, type=int),
+                                   **query)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    candidates = []
+    for candidate in page['candidates'].values():
+        row = candidate.to_dict()
+        # position_applied holds the display text (records.normalize_positions)
+        row['position_display'] = candidate.get('position_applied')
+        candidates.append(row)
+    response = jsonify({
+        'candidates': candidates,
+        'count': len(candidates),
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'query': query
+    })
+    # Clients revalidate every time; unchanged pages cost a 304 without a body
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/api/search')
+def api_search():
+    """Ranked quick search over register_id, name, department, positions and
+    skills (search_index.py). Words match by prefix or similarity; prefix a
+    word with skill:, name:, dept:, position: or id: to search one field."""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    if not SEARCH_INDEX_ENABLED:
+        return jsonify({'error': 'Search index is disabled'}), 404
+    
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    started = time.perf_counter()
+    results = search_index.search(query, limit)
+    return jsonify({
+        'query': query,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2)
+    })
 
 @app.route('/view_checklist/<register_id>')
 def view_checklist(register_id):
@@ -520,7 +690,10 @@ def view_checklist(register_id):
     
     checklist = get_checklist(register_id)
     
-    return render_template('view_checklist.html', candidate=candidate, checklist=checklist)
+    # Revalidating an unchanged page is a 304 without rendering
+    return http_cache.conditional_page(
+        (candidate, checklist),
+        lambda: render_template('view_checklist.html', candidate=candidate, checklist=checklist))
 
 @app.route('/edit_checklist/<register_id>', methods=['GET', 'POST'])
 def edit_checklist(register_id):
@@ -563,8 +736,8 @@ def edit_checklist(register_id):
         elif user_role == 'faculty_reviewer' and not reviewed_by:
             reviewed_by = user_name
         
-        # Get existing checklist
-        existing_checklist = get_checklist(register_id) or {}
+        # Existing checklist was loaded above
+        existing_checklist = checklist
         
         # Prepare checklist data based on role
         if user_role == 'faculty_reviewer':
@@ -634,7 +807,9 @@ def report(register_id):
     checklist = get_checklist(register_id)
     
     # Use the new professional checklist report template
-    return render_template('checklist_report.html', candidate=candidate, checklist=checklist)
+    return http_cache.conditional_page(
+        (candidate, checklist),
+        lambda: render_template('checklist_report.html', candidate=candidate, checklist=checklist))
 
 @app.route('/download_pdf/<register_id>')
 def download_pdf(register_id):
@@ -646,175 +821,30 @@ def download_pdf(register_id):
     if not candidate:
         return redirect(url_for('view_candidates'))
     
+    from pdf_reports import render_candidate_pdf
     checklist = get_checklist(register_id)
+    download_name = f'checklist_{register_id}.pdf'
     
-    # Create PDF with watermark
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, 
-                            rightMargin=0.5*inch, leftMargin=0.5*inch,
-                            topMargin=0.5*inch, bottomMargin=0.5*inch)
-    story = []
-    
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#1a73e8'),
-        spaceAfter=12,
-        alignment=1,  # Center
-        fontName='Helvetica-Bold'
-    )
-    
-    # Header with logo
-    logo_path = os.path.join('static', 'KARE-ACM-SiGBED.png')
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=1.2*inch, height=1.2*inch)
-        story.append(logo)
-        story.append(Spacer(1, 0.1*inch))
-    
-    story.append(Paragraph("GDG On Campus", title_style))
-    story.append(Paragraph("Kalasalingam Academy of Research & Education", styles['Heading2']))
-    story.append(Paragraph("Core Recruitment 2026 - Interview Checklist Report", styles['Heading3']))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Candidate Details
-    story.append(Paragraph("<b>Candidate Details</b>", styles['Heading2']))
-    candidate_data = [
-        ['Register ID:', candidate['register_id']],
-        ['Name:', candidate['candidate_name']],
-        ['Department:', candidate['department']],
-        ['Position Applied:', format_positions(candidate['position_applied'])],
-        ['Day Scholar / Hosteler:', candidate['day_scholar_hosteler']],
-        ['Phone Number:', candidate['phone_number']],
-        ['LinkedIn:', candidate['linkedin_profile']],
-        ['GitHub:', candidate['github_profile']]
-    ]
-    
-    candidate_table = Table(candidate_data, colWidths=[2*inch, 4*inch])
-    candidate_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(candidate_table)
-    story.append(Spacer(1, 0.2*inch))
-    
-    if checklist:
-        # Technical Skills
-        if checklist.get('technical_skills'):
-            story.append(Paragraph("<b>Technical Skills</b>", styles['Heading2']))
-            skills_data = [['Technology', 'Skill Level']]
-            for skill in checklist['technical_skills']:
-                skills_data.append([skill['technology'], skill['skill_level']])
-            
-            skills_table = Table(skills_data, colWidths=[3*inch, 3*inch])
-            skills_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(skills_table)
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Evaluation
-        story.append(Paragraph("<b>Evaluation</b>", styles['Heading2']))
-        eval_data = [
-            ['Practical Experience:', checklist.get('practical_experience', 'N/A')],
-            ['Communication Skills:', checklist.get('communication_skills', 'N/A')],
-            ['Time Management:', checklist.get('time_management', 'N/A')],
-            ['Leadership Ability:', checklist.get('leadership_ability', 'N/A')]
-        ]
-        
-        eval_table = Table(eval_data, colWidths=[2*inch, 4*inch])
-        eval_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(eval_table)
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Comments
-        if checklist.get('interviewer_comments'):
-            story.append(Paragraph("<b>Interviewer Comments:</b>", styles['Heading3']))
-            story.append(Paragraph(checklist['interviewer_comments'], styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-        
-        if checklist.get('faculty_comments'):
-            story.append(Paragraph("<b>Faculty Mentor Comments:</b>", styles['Heading3']))
-            story.append(Paragraph(checklist['faculty_comments'], styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-        
-        # Internal
-        story.append(Paragraph("<b>Internal Official Use</b>", styles['Heading2']))
-        internal_data = [
-            ['Interview Taken By:', checklist.get('interview_taken_by', 'N/A')],
-            ['Reviewed By:', checklist.get('reviewed_by', 'N/A')],
-            ['Remarks:', checklist.get('remarks', 'N/A')]
-        ]
-        
-        internal_table = Table(internal_data, colWidths=[2*inch, 4*inch])
-        internal_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(internal_table)
-    
-    # Define page drawing function
-    def on_first_page(canv, doc):
-        canv.saveState()
-        
-        # Draw watermark image (repeating pattern)
-        watermark_path = os.path.join('static', 'Watermark.jpg')
-        if os.path.exists(watermark_path):
-            try:
-                # Set transparency for watermark effect
-                canv.setFillAlpha(0.15)
-                canv.setStrokeAlpha(0.15)
-                
-                # Draw watermark in repeating pattern across the page
-                watermark_size = 4*inch
-                for x in range(0, int(doc.width + doc.leftMargin + doc.rightMargin), int(watermark_size)):
-                    for y in range(0, int(doc.height + doc.topMargin + doc.bottomMargin), int(watermark_size)):
-                        canv.drawImage(watermark_path, 
-                                     x + doc.leftMargin, 
-                                     y + doc.bottomMargin,
-                                     width=watermark_size, 
-                                     height=watermark_size, 
-                                     preserveAspectRatio=True, 
-                                     mask='auto')
-            except Exception as e:
-                pass  # If image fails to load, continue without it
-        
-        canv.restoreState()
-    
-    doc.build(story, onFirstPage=on_first_page, onLaterPages=on_first_page)
-    buffer.seek(0)
+    # Repeat downloads of unchanged content are plain file sends
+    if PDF_CACHE_ENABLED:
+        path = pdf_cache.get_or_render(register_id, candidate, checklist,
+                                       lambda: render_candidate_pdf(candidate, checklist))
+        return send_file(path, mimetype='application/pdf',
+                        as_attachment=True,
+                        download_name=download_name)
     
-    return send_file(buffer, mimetype='application/pdf', 
+    return send_file(io.BytesIO(render_candidate_pdf(candidate, checklist)), mimetype='application/pdf', 
                     as_attachment=True, 
-                    download_name=f'checklist_{register_id}.pdf')
+                    download_name=download_name)
+
+def all_pdf_entries():
+    """(candidate, checklist) pairs of the all-candidates report, in listing order"""
+    checklists, candidates = run_parallel(get_all_checklists, get_all_candidates)
+    return [(candidate, checklists[register_id])
+            for register_id, candidate in candidates.items() if register_id in checklists]
+
+def all_pdf_download_name() -> str:
+    return f'all_checklists_{datetime.now().strftime("%Y%m%d")}.pdf'
 
 @app.route('/download_all_pdf')
 def download_all_pdf():
@@ -822,96 +852,123 @@ def download_all_pdf():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    candidates = get_all_candidates()
-    checklists = get_all_checklists()
-    
-    # Create PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    story = []
-    
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#1a73e8'),
-        spaceAfter=12,
-        alignment=1,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Header with logo
-    logo_path = os.path.join('static', 'KARE-ACM-SiGBED.png')
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=1.2*inch, height=1.2*inch)
-        story.append(logo)
-        story.append(Spacer(1, 0.1*inch))
-    
-    story.append(Paragraph("GDG On Campus", title_style))
-    story.append(Paragraph("Kalasalingam Academy of Research & Education", styles['Heading2']))
-    story.append(Paragraph("Core Recruitment 2026 - All Interview Checklist Reports", styles['Heading3']))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Generate report for each candidate with checklist
+    from pdf_reports import render_all_pdf
+    # Rendered in parallel parts; POST /jobs/all_pdf renders it in the background
+    output = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    render_all_pdf(all_pdf_entries(), output)
+    output.seek(0)
+    
+    return send_file(output, mimetype='application/pdf', 
+                    as_attachment=True, 
+                    download_name=all_pdf_download_name())
+
+@app.route('/download_all_zip')
+def download_all_zip():
+    """Download a ZIP of the individual candidate PDFs, optionally filtered by
+    department and checklist status like view_candidates"""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    department = request.args.get('department', '').strip()
+    status = request.args.get('status', '').strip()
+    if status not in ('completed', 'pending'):
+        status = ''
+    
+    checklists, candidates = run_parallel(get_all_checklists, get_all_candidates)
+    entries = []
     for register_id, candidate in candidates.items():
         checklist = checklists.get(register_id)
-        if not checklist:
+        if department and candidate.get('department') != department:
             continue
-        
-        # Page break before each candidate (except first)
-        if story:
-            story.append(Spacer(1, 0.2*inch))
-        
-        # Candidate Details
-        story.append(Paragraph(f"<b>Candidate: {candidate['candidate_name']} ({register_id})</b>", styles['Heading2']))
-        candidate_data = [
-            ['Register ID:', candidate['register_id']],
-            ['Name:', candidate['candidate_name']],
-            ['Department:', candidate['department']],
-            ['Position Applied:', format_positions(candidate['position_applied'])]
-        ]
-        
-        candidate_table = Table(candidate_data, colWidths=[2*inch, 4*inch])
-        candidate_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        story.append(candidate_table)
-        story.append(Spacer(1, 0.1*inch))
-        
-        # Technical Skills Summary
-        if checklist.get('technical_skills'):
-            skills_text = ", ".join([f"{s['technology']} ({s['skill_level']})" 
-                                    for s in checklist['technical_skills']])
-            story.append(Paragraph(f"<b>Technical Skills:</b> {skills_text}", styles['Normal']))
-        
-        # Evaluation Summary
-        eval_text = f"Communication: {checklist.get('communication_skills', 'N/A')}, "
-        eval_text += f"Time Management: {checklist.get('time_management', 'N/A')}, "
-        eval_text += f"Leadership: {checklist.get('leadership_ability', 'N/A')}"
-        story.append(Paragraph(f"<b>Evaluation:</b> {eval_text}", styles['Normal']))
-        
-        story.append(Spacer(1, 0.1*inch))
-        story.append(Paragraph("─" * 80, styles['Normal']))
+        if (status == 'completed' and checklist is None) or (status == 'pending' and checklist is not None):
+            continue
+        entries.append((f'checklist_{secure_filename(register_id) or "candidate"}.pdf', candidate, checklist))
+    
+    from pdf_reports import iter_candidate_pdfs, stream_pdf_zip
+    # Reports are rendered concurrently and written to the response as each
+    # one finishes; only the archive's current member is held in memory
+    pdfs = iter_candidate_pdfs(entries, cache=pdf_cache if PDF_CACHE_ENABLED else None)
+    name_parts = ['checklists', secure_filename(department), status, datetime.now().strftime('%Y%m%d')]
+    download_name = '_'.join(part for part in name_parts if part) + '.zip'
+    return Response(stream_pdf_zip(pdfs), mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename={download_name}'})
+
+# Background jobs (jobs.py): submit, poll /jobs/<job_id>, then download the file
+
+@register_job('all_pdf')
+def run_all_pdf_job(job):
+    """Render the all-candidates report to the job's directory"""
+    from pdf_reports import render_all_pdf
+    entries = all_pdf_entries()
+    job.progress(0, len(entries), 'Rendering PDF')
+    path = job.path('all_checklists.pdf')
+    with open(path, 'wb') as output:
+        render_all_pdf(entries, output, progress=job.progress)
+    return {'file': path, 'download_name': all_pdf_download_name(), 'mimetype': 'application/pdf',
+            'message': f'Rendered {len(entries)} checklist(s).'}
+
+@register_job('import_candidates')
+def run_import_job(job):
+    """Import the CSV saved in the job's directory by import_candidates()"""
+    with open(job.path('candidates.csv'), encoding='utf-8') as f:
+        csv_text = f.read()
+    job.progress(0, None, 'Importing candidates')
+    return import_candidates_csv(csv_text, progress=job.progress)
+
+def _job_for_session(job_id):
+    """The job if the session may see it (its owner or an admin), else None"""
+    job = job_runner.get(job_id)
+    if job is None or (job['owner'] != session.get('user_id') and session.get('role') != 'admin'):
+        return None
+    return job
+
+def _job_json(job):
+    job = dict(job)
+    job['status_url'] = url_for('job_status', job_id=job['job_id'])
+    job['download_url'] = url_for('job_download', job_id=job['job_id']) if job['has_file'] else None
+    return job
+
+@app.route('/jobs/all_pdf', methods=['POST'])
+def submit_all_pdf_job():
+    """Start rendering the all-candidates report in the background"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
     
-    doc.build(story)
-    buffer.seek(0)
+    job_id = job_runner.submit('all_pdf', owner=session['user_id'])
+    return jsonify(_job_json(job_runner.get(job_id))), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Progress and result of a background job"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
     
-    return send_file(buffer, mimetype='application/pdf', 
-                    as_attachment=True, 
-                    download_name=f'all_checklists_{datetime.now().strftime("%Y%m%d")}.pdf')
+    job = _job_for_session(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_json(job))
+
+@app.route('/jobs/<job_id>/download')
+def job_download(job_id):
+    """The file produced by a finished background job"""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    if _job_for_session(job_id) is None:
+        return "Job not found", 404
+    result = job_runner.result_file(job_id)
+    if result is None:
+        return "Job has no file (not finished, failed or expired)", 404
+    return send_file(result['path'], mimetype=result['mimetype'],
+                    as_attachment=True, download_name=result['download_name'])
 
 # Initialize default user and start keep-alive thread
 # This runs when the module is imported (works with both Flask dev server and Gunicorn)
-init_default_user()
-start_keep_alive_thread()
+# PDF render processes re-import a script run as `python app.py` as __mp_main__;
+# they must not do either
+if __name__ != '__mp_main__':
+    init_default_user()
+    start_keep_alive_thread()
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8080)
@@ -0,0 +1,724 @@
+"""
+Storage backends behind db.py
+Each backend implements the same raw operations on users, candidates and
+checklists and raises on failure; db.py adds caching, error handling and
+cache invalidation on top. Pick one with DB_BACKEND (see db.get_backend).
+"""
+import bisect
+import functools
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
+from resilience import CircuitBreaker, RetryPolicy, guarded_call
+from records import normalize_positions
+
+# register_ids per request when filtering checklists by id, keeps URLs short
+CHECKLIST_BATCH_SIZE = 100
+
+# View returning each checklist with its skills nested (database_functions.sql)
+CHECKLIST_VIEW = 'checklists_with_skills_re26'
+
+# Candidate columns matched by the text search of candidate listings
+CANDIDATE_SEARCH_COLUMNS = ('register_id', 'candidate_name', 'department', 'position_applied')
+
+def _postgrest_value(value: str) -> str:
+    """Quote a value for a PostgREST or=(...) filter"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _contains_pattern(text: str) -> str:
+    """PostgREST (i)like pattern matching `text` anywhere; LIKE wildcards in
+    the text match any single character"""
+    return '*' + re.sub(r'[%_*\\]', '_', text) + '*'
+
+def diff_skills(existing: List[Dict], new: List[Dict]):
+    """Compare stored and submitted skills by (technology, skill_level).
+
+    Returns (removed, added): stored skills no longer listed and listed skills
+    not stored yet. Unchanged skills appear in neither list. Mirrors the diff
+    done by save_checklist_re26 in database_functions.sql.
+    """
+    existing_pairs = {(s['technology'], s['skill_level']) for s in existing}
+    new_pairs = {(s['technology'], s['skill_level']) for s in new}
+    removed = [s for s in existing if (s['technology'], s['skill_level']) not in new_pairs]
+    added = [s for s in new if (s['technology'], s['skill_level']) not in existing_pairs]
+    return removed, added
+
+def _missing_positions_column(error: Exception) -> bool:
+    """PGRST204 (column not in the schema cache, writes) or 42703 (undefined
+    column, filters) for candidates_re26.positions"""
+    return (getattr(error, 'code', None) in ('PGRST204', '42703') and
+            'positions' in str(getattr(error, 'message', None) or error))
+
+def _read(method):
+    """Idempotent SupabaseBackend call: circuit breaker and retries"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return guarded_call(lambda: method(self, *args, **kwargs), self.breaker, self.retry)
+    return wrapper
+
+def _write(method):
+    """Non-idempotent SupabaseBackend call: circuit breaker, never retried"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return guarded_call(lambda: method(self, *args, **kwargs), self.breaker)
+    return wrapper
+
+def _sequential(*calls) -> List[Any]:
+    """Default for SupabaseBackend's `parallel` argument"""
+    return [call() for call in calls]
+
+class StorageBackend:
+    """Operations every backend provides.
+
+    Reads return plain dicts shaped like PostgREST rows; checklists carry a
+    `technical_skills` list of {'technology', 'skill_level'} dicts.
+    """
+    name = 'base'
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_all_users(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def create_user(self, record: Dict):
+        raise NotImplementedError
+
+    def update_user(self, user_id: str, updates: Dict):
+        raise NotImplementedError
+
+    def delete_user(self, user_id: str):
+        raise NotImplementedError
+
+    def get_candidate(self, register_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_all_candidates(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def get_candidate_ids(self) -> set:
+        raise NotImplementedError
+
+    def get_candidate_departments(self) -> List[str]:
+        raise NotImplementedError
+
+    def fetch_candidates_page(self, after: Optional[tuple], before: Optional[tuple], limit: int,
+                              department: Optional[str], status: Optional[str],
+                              columns: List[str], search: Optional[str] = None,
+                              position: Optional[str] = None, sort: str = 'register_id',
+                              descending: bool = False) -> List[Dict]:
+        """Up to `limit` rows ordered by (sort, register_id), each with a
+        `has_checklist` flag; NULL sort values come after all others, as in
+        PostgreSQL. Cursors are (sort value, register_id) keys: rows
+        come after `after`, or before `before` in reverse order. `search`
+        matches CANDIDATE_SEARCH_COLUMNS case-insensitively anywhere in the
+        text; `position` must be one of the candidate's positions. db.get_candidates_page
+        asks for one row more than it shows to detect further pages."""
+        raise NotImplementedError
+
+    def create_candidate(self, record: Dict):
+        raise NotImplementedError
+
+    def insert_candidates(self, records: List[Dict]) -> set:
+        """Insert rows, skipping existing register_ids; returns the ids inserted"""
+        raise NotImplementedError
+
+    def update_candidate(self, register_id: str, updates: Dict):
+        raise NotImplementedError
+
+    def get_checklists(self, register_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Checklists keyed by register_id; all of them when register_ids is None"""
+        raise NotImplementedError
+
+    def save_checklist(self, register_id: str, record: Dict, skills: List[Dict]):
+        raise NotImplementedError
+
+    def get_dashboard_counts(self) -> Dict[str, int]:
+        """{'candidates', 'checklists', 'faculty_reviewed'} row counts"""
+        raise NotImplementedError
+
+    def status(self) -> Dict[str, Any]:
+        """Backend state for monitoring"""
+        return {'backend': self.name}
+
+
+class SupabaseBackend(StorageBackend):
+    """Supabase (PostgREST) tables *_re26"""
+    name = 'supabase'
+
+    def __init__(self, parallel=None, breaker: CircuitBreaker = None, retry: RetryPolicy = None):
+        # Runs independent queries concurrently; db.py passes run_parallel
+        self.parallel = parallel or _sequential
+        self.breaker = breaker or CircuitBreaker('supabase')
+        self.retry = retry or RetryPolicy()
+        # Flipped once PostgREST reports the optional SQL objects as missing
+        self.checklist_view_available = True
+        self.save_checklist_rpc_available = True
+        self.positions_column_available = True
+
+    def _client(self):
+        from supabase_config import get_supabase_client
+        return get_supabase_client()
+
+    @_read
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        response = self._client().table('users_re26').select('*').eq('user_id', user_id).execute()
+        return response.data[0] if response.data else None
+
+    @_read
+    def get_all_users(self) -> Dict[str, Dict]:
+        response = self._client().table('users_re26').select('*').execute()
+        return {user['user_id']: user for user in response.data}
+
+    @_write
+    def create_user(self, record: Dict):
+        self._client().table('users_re26').insert(record).execute()
+
+    @_write
+    def update_user(self, user_id: str, updates: Dict):
+        self._client().table('users_re26').update(updates).eq('user_id', user_id).execute()
+
+    @_write
+    def delete_user(self, user_id: str):
+        self._client().table('users_re26').delete().eq('user_id', user_id).execute()
+
+    @_read
+    def get_candidate(self, register_id: str) -> Optional[Dict]:
+        response = self._client().table('candidates_re26').select('*').eq('register_id', register_id).execute()
+        return response.data[0] if response.data else None
+
+    @_read
+    def get_all_candidates(self) -> Dict[str, Dict]:
+        response = self._client().table('candidates_re26').select('*').execute()
+        return {candidate['register_id']: candidate for candidate in response.data}
+
+    @_read
+    def get_candidate_ids(self) -> set:
+        response = self._client().table('candidates_re26').select('register_id').execute()
+        return {row['register_id'] for row in response.data}
+
+    @_read
+    def get_candidate_departments(self) -> List[str]:
+        response = self._client().table('candidates_re26').select('department').execute()
+        return sorted({row['department'] for row in response.data if row.get('department')})
+
+    @_read
+    def fetch_candidates_page(self, after, before, limit, department, status, columns,
+                              search=None, position=None, sort='register_id', descending=False):
+        backwards = before is not None and after is None
+        key = before if backwards else after
+        reverse = descending != backwards
+
+        def build():
+            select = ','.join(columns)
+            # Embed the checklist key to derive has_checklist and filter on it
+            if status == 'completed':
+                select += ',checklists_re26!inner(register_id)'
+            else:
+                select += ',checklists_re26(register_id)'
+            query = self._client().table('candidates_re26').select(select)
+            if status == 'pending':
+                query = query.is_('checklists_re26', 'null')
+            if department:
+                query = query.eq('department', department)
+            if search:
+                pattern = _postgrest_value(_contains_pattern(search))
+                query = query.or_(','.join(f'{column}.ilike.{pattern}' for column in CANDIDATE_SEARCH_COLUMNS))
+            if position:
+                if self.positions_column_available:
+                    # Array containment, served by the GIN index on positions
+                    query = query.contains('positions', [position])
+                else:
+                    query = query.ilike('position_applied', _contains_pattern(position))
+            if key is not None:
+                op = 'lt' if reverse else 'gt'
+                value, register_id = key
+                if sort == 'register_id':
+                    query = query.filter('register_id', op, register_id)
+                elif value is None:
+                    # NULLs sort after every value: last ascending, first descending
+                    if reverse:
+                        query = query.or_(f'{sort}.not.is.null,'
+                                          f'and({sort}.is.null,register_id.lt.{_postgrest_value(register_id)})')
+                    else:
+                        query = query.is_(sort, 'null').filter('register_id', 'gt', register_id)
+                elif reverse:
+                    # Past the key: an earlier sort value, or the same one with an earlier register_id
+                    query = query.filter(sort, 'lte', value)
+                    query = query.or_(f'{sort}.lt.{_postgrest_value(value)},'
+                                      f'register_id.lt.{_postgrest_value(register_id)}')
+                else:
+                    # Past the key: a later sort value, the same one with a later register_id, or NULL
+                    quoted = _postgrest_value(value)
+                    query = query.or_(f'{sort}.gt.{quoted},{sort}.is.null,'
+                                      f'and({sort}.eq.{quoted},register_id.gt.{_postgrest_value(register_id)})')
+            if sort != 'register_id':
+                query = query.order(sort, desc=reverse, nullsfirst=reverse)
+            return query.order('register_id', desc=reverse).limit(limit)
+
+        try:
+            rows = build().execute().data
+        except Exception as e:
+            if not (position and self.positions_column_available and _missing_positions_column(e)):
+                raise
+            self._positions_column_missing()
+            rows = build().execute().data
+        for row in rows:
+            row['has_checklist'] = bool(row.pop('checklists_re26', None))
+        return rows
+
+    def _positions_column_missing(self):
+        print("candidates_re26.positions not found, run database_functions.sql; "
+              "filtering positions on position_applied")
+        self.positions_column_available = False
+
+    def _write_candidates(self, write, records: List[Dict]):
+        """Run write(records); without the positions column (database_functions.sql
+        not run yet) the rows are written without it"""
+        if self.positions_column_available:
+            try:
+                return write(records)
+            except Exception as e:
+                if not _missing_positions_column(e):
+                    raise
+                self._positions_column_missing()
+        return write([{k: v for k, v in record.items() if k != 'positions'} for record in records])
+
+    @_write
+    def create_candidate(self, record: Dict):
+        self._write_candidates(
+            lambda records: self._client().table('candidates_re26').insert(records[0]).execute(), [record])
+
+    @_write
+    def insert_candidates(self, records: List[Dict]) -> set:
+        # ON CONFLICT (register_id) DO NOTHING; skipped rows are not returned
+        response = self._write_candidates(
+            lambda rows: self._client().table('candidates_re26').upsert(
+                rows, on_conflict='register_id', ignore_duplicates=True).execute(), records)
+        return {row['register_id'] for row in response.data}
+
+    @_write
+    def update_candidate(self, register_id: str, updates: Dict):
+        self._write_candidates(
+            lambda records: self._client().table('candidates_re26').update(records[0])
+            .eq('register_id', register_id).execute(), [updates])
+
+    def status(self):
+        return {'backend': self.name, 'circuit': self.breaker.status()}
+
+    def _fetch_checklists(self, apply_filter) -> List[Dict]:
+        """Fetch checklists with a nested technical_skills list.
+
+        `apply_filter` receives a query builder and adds register_id filters to
+        it. Uses a single query on CHECKLIST_VIEW; falls back to querying the
+        two tables when the view has not been created yet.
+        """
+        supabase = self._client()
+
+        if self.checklist_view_available:
+            try:
+                return apply_filter(supabase.table(CHECKLIST_VIEW).select('*')).execute().data
+            except Exception as e:
+                # PGRST205 / 42P01: relation not found
+                if getattr(e, 'code', None) not in ('PGRST205', '42P01'):
+                    raise
+                print(f"{CHECKLIST_VIEW} not found, run database_functions.sql; using two queries")
+                self.checklist_view_available = False
+
+        checklists, skills = self.parallel(
+            lambda: apply_filter(supabase.table('checklists_re26').select('*')).execute().data,
+            lambda: apply_filter(
+                supabase.table('technical_skills_re26').select('register_id,technology,skill_level')).execute().data
+        )
+
+        # Group skills by register_id
+        skills_by_register = {}
+        for skill in skills:
+            skills_by_register.setdefault(skill['register_id'], []).append({
+                'technology': skill['technology'],
+                'skill_level': skill['skill_level']
+            })
+        for checklist in checklists:
+            checklist['technical_skills'] = skills_by_register.get(checklist['register_id'], [])
+        return checklists
+
+    @_read
+    def get_checklists(self, register_ids=None):
+        if register_ids is None:
+            rows = self._fetch_checklists(lambda query: query)
+        else:
+            rows = []
+            for start in range(0, len(register_ids), CHECKLIST_BATCH_SIZE):
+                batch = register_ids[start:start + CHECKLIST_BATCH_SIZE]
+                rows.extend(self._fetch_checklists(lambda query: query.in_('register_id', batch)))
+        checklists = {}
+        for checklist in rows:
+            checklist['technical_skills'] = checklist.get('technical_skills') or []
+            checklists[checklist['register_id']] = checklist
+        return checklists
+
+    @_write
+    def save_checklist(self, register_id, record, skills):
+        """One transactional RPC; step by step when the function is not deployed"""
+        supabase = self._client()
+        if self.save_checklist_rpc_available:
+            try:
+                supabase.rpc('save_checklist_re26', {
+                    'p_register_id': register_id,
+                    'p_checklist': record,
+                    'p_skills': skills
+                }).execute()
+                return
+            except Exception as e:
+                # PGRST202: function not found in the schema cache
+                if getattr(e, 'code', None) != 'PGRST202':
+                    raise
+                print("save_checklist_re26 not found, run database_functions.sql; saving step by step")
+                self.save_checklist_rpc_available = False
+        self._save_checklist_stepwise(supabase, register_id, record, skills)
+
+    def _save_checklist_stepwise(self, supabase, register_id, record, skills):
+        """Local stand-in for save_checklist_re26: same effect, but made of
+        separate requests and therefore not atomic"""
+        existing = supabase.table('checklists_re26').select('checklist_id').eq('register_id', register_id).execute()
+        if existing.data:
+            # Update existing checklist (trigger will auto-update updated_at)
+            supabase.table('checklists_re26').update(record).eq('register_id', register_id).execute()
+        else:
+            # Create new checklist (defaults will set created_at and updated_at)
+            supabase.table('checklists_re26').insert(record).execute()
+
+        stored = supabase.table('technical_skills_re26').select('technology,skill_level').eq('register_id', register_id).execute()
+        removed, added = diff_skills(stored.data, skills)
+        for skill in removed:
+            supabase.table('technical_skills_re26').delete().eq('register_id', register_id) \
+                .eq('technology', skill['technology']).eq('skill_level', skill['skill_level']).execute()
+        if added:
+            supabase.table('technical_skills_re26').insert([
+                {'register_id': register_id, 'technology': skill['technology'], 'skill_level': skill['skill_level']}
+                for skill in added
+            ]).execute()
+
+    @_read
+    def get_dashboard_counts(self):
+        """Exact HEAD counts, no rows downloaded"""
+        supabase = self._client()
+
+        def count(query):
+            return query.execute().count or 0
+
+        candidates, checklists, faculty_reviewed = self.parallel(
+            lambda: count(supabase.table('candidates_re26').select('register_id', count='exact', head=True)),
+            lambda: count(supabase.table('checklists_re26').select('register_id', count='exact', head=True)),
+            # Comments are stripped before saving, so empty means not reviewed
+            lambda: count(supabase.table('checklists_re26').select('register_id', count='exact', head=True)
+                          .not_.is_('faculty_comments', 'null').neq('faculty_comments', ''))
+        )
+        return {'candidates': candidates, 'checklists': checklists, 'faculty_reviewed': faculty_reviewed}
+
+
+class ReplicaBackend(StorageBackend):
+    """Reads from the local SQLite replica (replica.py), writes through to Supabase"""
+    name = 'replica'
+
+    def __init__(self, path: str, sync_interval: float, reconcile_interval: float, parallel=None,
+                 breaker: CircuitBreaker = None, retry: RetryPolicy = None):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self.remote = SupabaseBackend(parallel=parallel, breaker=breaker, retry=retry)
+        self._replica = None
+        self._replica_pid = None
+        self._lock = threading.Lock()
+
+    def replica(self):
+        """The replica of this process; the first call fills an empty file and
+        starts the background sync thread"""
+        if self._replica_pid == os.getpid():
+            return self._replica
+        with self._lock:
+            if self._replica_pid != os.getpid():
+                if self._replica is None:
+                    from replica import Replica
+                    self._replica = Replica(self.path, self.sync_interval, self.reconcile_interval)
+                self._replica.ensure_synced()
+                self._replica.start()
+                self._replica_pid = os.getpid()
+            return self._replica
+
+    def _sync(self, table: str):
+        """Pull a write back into the replica so the next read sees it"""
+        try:
+            self.replica().sync([table])
+        except Exception as e:
+            print(f"Error syncing replica after write: {e}")
+
+    def get_user(self, user_id):
+        return self.replica().get_user(user_id)
+
+    def get_all_users(self):
+        return self.replica().get_all_users()
+
+    def create_user(self, record):
+        self.remote.create_user(record)
+        self._sync('users')
+
+    def update_user(self, user_id, updates):
+        self.remote.update_user(user_id, updates)
+        self._sync('users')
+
+    def delete_user(self, user_id):
+        self.remote.delete_user(user_id)
+        self.replica().delete('users', user_id)
+
+    def get_candidate(self, register_id):
+        return self.replica().get_candidate(register_id)
+
+    def get_all_candidates(self):
+        return self.replica().get_all_candidates()
+
+    def get_candidate_ids(self):
+        return self.replica().get_candidate_ids()
+
+    def get_candidate_departments(self):
+        return self.replica().get_candidate_departments()
+
+    def fetch_candidates_page(self, after, before, limit, department, status, columns,
+                              search=None, position=None, sort='register_id', descending=False):
+        return self.replica().fetch_candidates_page(after, before, limit, department, status, columns,
+                                                    search, position, sort, descending)
+
+    def create_candidate(self, record):
+        self.remote.create_candidate(record)
+        self._sync('candidates')
+
+    def insert_candidates(self, records):
+        try:
+            return self.remote.insert_candidates(records)
+        finally:
+            self._sync('candidates')
+
+    def update_candidate(self, register_id, updates):
+        self.remote.update_candidate(register_id, updates)
+        self._sync('candidates')
+
+    def get_checklists(self, register_ids=None):
+        return self.replica().get_checklists(register_ids)
+
+    def save_checklist(self, register_id, record, skills):
+        try:
+            self.remote.save_checklist(register_id, record, skills)
+        finally:
+            self._sync('checklists')
+
+    def get_dashboard_counts(self):
+        return self.replica().get_dashboard_counts()
+
+    def status(self):
+        return dict(self.replica().status(), backend=self.name, circuit=self.remote.breaker.status())
+
+
+class MemoryBackend(StorageBackend):
+    """Everything in process memory, for offline development, load tests and
+    profiling of the Flask layer. Data lives until the process exits."""
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.users = {}
+        self.candidates = {}
+        self.checklists = {}
+        self.skills = {}
+        self._sorted_ids = None
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def load_json_dir(self, path: str):
+        """Seed from sample_users.json, sample_candidates.json and
+        sample_checklists.json (the format of samples/) when present"""
+        def read(name):
+            file_path = os.path.join(path, name)
+            if not os.path.exists(file_path):
+                return {}
+            with open(file_path, encoding='utf-8') as f:
+                return json.load(f)
+
+        users = read('sample_users.json')
+        self.seed(
+            users=[dict(user, user_id=user_id) for user_id, user in users.items()],
+            candidates=list(read('sample_candidates.json').values()),
+            checklists=list(read('sample_checklists.json').values())
+        )
+
+    def seed(self, users=(), candidates=(), checklists=()):
+        """Bulk load rows; checklists may carry their technical_skills"""
+        with self._lock:
+            for user in users:
+                self.users[user['user_id']] = dict(user)
+            for candidate in candidates:
+                # Like database_functions.sql does for stored rows
+                self.candidates[candidate['register_id']] = normalize_positions(dict(candidate))
+            for checklist in checklists:
+                checklist = dict(checklist)
+                self.skills[checklist['register_id']] = [
+                    {'technology': s['technology'], 'skill_level': s['skill_level']}
+                    for s in checklist.pop('technical_skills', None) or []
+                ]
+                self.checklists[checklist['register_id']] = checklist
+            self._sorted_ids = None
+
+    def _ids(self) -> List[str]:
+        """register_ids in order, rebuilt only after inserts"""
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(self.candidates)
+        return self._sorted_ids
+
+    def get_user(self, user_id):
+        user = self.users.get(user_id)
+        return dict(user) if user else None
+
+    def get_all_users(self):
+        with self._lock:
+            return {user_id: dict(user) for user_id, user in self.users.items()}
+
+    def create_user(self, record):
+        with self._lock:
+            if record['user_id'] in self.users:
+                raise ValueError(f"duplicate user_id {record['user_id']}")
+            self.users[record['user_id']] = dict(record, updated_at=self._now())
+
+    def update_user(self, user_id, updates):
+        with self._lock:
+            if user_id in self.users:
+                self.users[user_id].update(updates, updated_at=self._now())
+
+    def delete_user(self, user_id):
+        with self._lock:
+            self.users.pop(user_id, None)
+
+    def get_candidate(self, register_id):
+        candidate = self.candidates.get(register_id)
+        return dict(candidate) if candidate else None
+
+    def get_all_candidates(self):
+        with self._lock:
+            return {register_id: dict(c) for register_id, c in self.candidates.items()}
+
+    def get_candidate_ids(self):
+        with self._lock:
+            return set(self.candidates)
+
+    def get_candidate_departments(self):
+        with self._lock:
+            return sorted({c['department'] for c in self.candidates.values() if c.get('department')})
+
+    def fetch_candidates_page(self, after, before, limit, department, status, columns,
+                              search=None, position=None, sort='register_id', descending=False):
+        backwards = before is not None and after is None
+        key = before if backwards else after
+        reverse = descending != backwards
+        search = search.lower() if search else None
+        with self._lock:
+            if sort == 'register_id':
+                # Walk the sorted ids from the cursor
+                ids = self._ids()
+                if key is None:
+                    candidate_ids = reversed(ids) if reverse else ids
+                elif reverse:
+                    candidate_ids = reversed(ids[:bisect.bisect_left(ids, key[1])])
+                else:
+                    candidate_ids = ids[bisect.bisect_right(ids, key[1]):]
+            else:
+                # NULLs sort after every value, as in PostgreSQL
+                def sort_key(register_id):
+                    value = self.candidates[register_id].get(sort)
+                    return (value is None, value or '', register_id)
+                candidate_ids = sorted(self.candidates, key=sort_key, reverse=reverse)
+                if key is not None:
+                    key = (key[0] is None, key[0] or '', key[1])
+                    candidate_ids = [i for i in candidate_ids
+                                     if (sort_key(i) < key if reverse else sort_key(i) > key)]
+
+            rows = []
+            for register_id in candidate_ids:
+                candidate = self.candidates[register_id]
+                has_checklist = register_id in self.checklists
+                if department and candidate.get('department') != department:
+                    continue
+                if (status == 'completed' and not has_checklist) or (status == 'pending' and has_checklist):
+                    continue
+                if search and not any(search in str(candidate.get(c) or '').lower()
+                                      for c in CANDIDATE_SEARCH_COLUMNS):
+                    continue
+                if position and position not in (candidate.get('positions') or ()):
+                    continue
+                row = dict(candidate) if columns == ['*'] else {c: candidate.get(c) for c in columns}
+                row['has_checklist'] = has_checklist
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+            return rows
+
+    def create_candidate(self, record):
+        with self._lock:
+            if record['register_id'] in self.candidates:
+                raise ValueError(f"duplicate register_id {record['register_id']}")
+            self.candidates[record['register_id']] = dict(record, updated_at=self._now())
+            self._sorted_ids = None
+
+    def insert_candidates(self, records):
+        inserted = set()
+        with self._lock:
+            for record in records:
+                if record['register_id'] not in self.candidates:
+                    self.candidates[record['register_id']] = dict(record, updated_at=self._now())
+                    inserted.add(record['register_id'])
+            self._sorted_ids = None
+        return inserted
+
+    def update_candidate(self, register_id, updates):
+        with self._lock:
+            if register_id in self.candidates:
+                self.candidates[register_id].update(updates, updated_at=self._now())
+
+    def get_checklists(self, register_ids=None):
+        with self._lock:
+            if register_ids is None:
+                register_ids = list(self.checklists)
+            checklists = {}
+            for register_id in register_ids:
+                checklist = self.checklists.get(register_id)
+                if checklist is not None:
+                    checklists[register_id] = dict(
+                        checklist, technical_skills=[dict(s) for s in self.skills.get(register_id, [])])
+            return checklists
+
+    def save_checklist(self, register_id, record, skills):
+        with self._lock:
+            now = self._now()
+            checklist = self.checklists.get(register_id)
+            if checklist is None:
+                checklist = self.checklists[register_id] = {'created_at': now}
+            checklist.update(record, updated_at=now)
+            self.skills[register_id] = [dict(s) for s in skills]
+
+    def get_dashboard_counts(self):
+        with self._lock:
+            return {
+                'candidates': len(self.candidates),
+                'checklists': len(self.checklists),
+                'faculty_reviewed': sum(1 for c in self.checklists.values() if c.get('faculty_comments'))
+            }
+
+    def status(self):
+        return {
+            'backend': self.name,
+            'users': len(self.users),
+            'candidates': len(self.candidates),
+            'checklists': len(self.checklists)
+        }
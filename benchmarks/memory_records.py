@@ -0,0 +1,119 @@
+"""
+Memory benchmark: candidate and checklist tables as PostgREST dicts vs records
+Builds synthetic tables shaped like candidates_re26 / checklists_with_skills_re26
+and measures, with tracemalloc, what one gunicorn worker holds for them, plus
+the per-request copy the dict cache used to make.
+
+Usage: python benchmarks/memory_records.py [--candidates 10000] [--json]
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import candidate_table, checklist_table  # noqa: E402
+
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics', 'Mechanical', 'Civil']
+POSITIONS = ['["Core Member"]', '["Technical Lead"]', '["Core Member", "Design Lead"]', '["Event Lead"]']
+RATINGS = ['Excellent', 'Good', 'Average', 'Needs Improvement']
+TECHNOLOGIES = ['Python', 'JavaScript', 'Java', 'C++', 'React', 'Flask', 'SQL', 'Go']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+
+def make_rows(count: int, seed: int = 1):
+    """Synthetic rows as json.loads would return them (no shared strings)"""
+    rng = random.Random(seed)
+    candidates, checklists = {}, {}
+    for i in range(count):
+        register_id = f'99220040{i:05d}'
+        candidates[register_id] = {
+            'register_id': register_id,
+            'candidate_name': f'Candidate {i}',
+            'department': rng.choice(DEPARTMENTS),
+            'position_applied': rng.choice(POSITIONS),
+            'day_scholar_hosteler': rng.choice(['Day Scholar', 'Hosteler']),
+            'phone_number': f'98{i:08d}',
+            'linkedin_profile': f'https://linkedin.com/in/candidate{i}',
+            'github_profile': f'https://github.com/candidate{i}',
+            'imported_at': '2026-01-15 10:00:00',
+            'updated_at': '2026-01-15T10:00:00+00:00'
+        }
+        checklists[register_id] = {
+            'checklist_id': i + 1,
+            'register_id': register_id,
+            'technical_skills': [{'technology': t, 'skill_level': rng.choice(LEVELS)}
+                                 for t in rng.sample(TECHNOLOGIES, 3)],
+            'practical_experience': 'Personal Project',
+            'communication_skills': rng.choice(RATINGS),
+            'time_management': rng.choice(RATINGS),
+            'leadership_ability': rng.choice(RATINGS),
+            'interviewer_comments': f'Comments on candidate {i}',
+            'faculty_comments': '',
+            'interview_taken_by': 'Interviewer',
+            'reviewed_by': '',
+            'remarks': '',
+            'created_at': '2026-01-15T11:00:00+00:00',
+            'updated_at': '2026-01-15T11:00:00+00:00'
+        }
+    # Round-trip through JSON so no string object is shared, like an HTTP response
+    return json.loads(json.dumps(candidates)), json.loads(json.dumps(checklists))
+
+def measure(build):
+    """Bytes still allocated by the object build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+def copy_dict_table(rows):
+    """What db._cached_rows handed out per request before records"""
+    return {key: dict(row) for key, row in rows.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    candidates, checklists = make_rows(args.candidates)
+    dict_bytes, _ = measure(lambda: make_rows(args.candidates))
+    copy_bytes, _ = measure(lambda: (copy_dict_table(candidates), copy_dict_table(checklists)))
+
+    # Record tables alone, after the source dicts are dropped
+    def records_only():
+        rows = make_rows(args.candidates)
+        return candidate_table(rows[0]), checklist_table(rows[1])
+    records_total, _ = measure(records_only)
+
+    workers = (os.cpu_count() or 1) * 2 + 1
+    results = {
+        'candidates': args.candidates,
+        'dict_tables_bytes': dict_bytes,
+        'record_tables_bytes': records_total,
+        'dict_copy_per_request_bytes': copy_bytes,
+        'saving_per_worker_bytes': dict_bytes - records_total,
+        'saving_ratio': round(1 - records_total / dict_bytes, 3) if dict_bytes else 0,
+        'gunicorn_workers': workers,
+        'saving_all_workers_bytes': (dict_bytes - records_total) * workers
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    mb = 1024 * 1024
+    print(f"{args.candidates} candidates with checklists")
+    print(f"  dict tables:            {dict_bytes / mb:8.1f} MB")
+    print(f"  record tables:          {records_total / mb:8.1f} MB")
+    print(f"  dict copy per request:  {copy_bytes / mb:8.1f} MB (records are shared, no copy)")
+    print(f"  saving per worker:      {results['saving_per_worker_bytes'] / mb:8.1f} MB "
+          f"({results['saving_ratio']:.0%})")
+    print(f"  saving for {workers} workers: {results['saving_all_workers_bytes'] / mb:8.1f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Route benchmark: PDF downloads and pages at growing data sizes
+Seeds the in-memory storage backend with synthetic candidates, checklists and
+skills (the rows of memory_records.py) at each scale and requests every route
+through Flask's test client, so the numbers cover the Flask, template and
+ReportLab layers without network time. For each route and scale it records
+the first (cold cache) request, the median of the timed repeats, the Python
+peak memory of one request (tracemalloc; render processes of the
+all-candidates PDF are not included) and the response size.
+
+Usage: python benchmarks/routes.py [--scales 10,100,1000,10000] [--routes ...]
+       [--repeat 3] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from memory_records import make_rows  # noqa: E402
+
+DEFAULT_SCALES = [10, 100, 1000, 10000]
+
+# Route name -> URL for a seeded table (the report routes use a middle candidate)
+ROUTES = {
+    'download_pdf': lambda ids: f'/download_pdf/{ids[len(ids) // 2]}',
+    'download_all_pdf': lambda ids: '/download_all_pdf',
+    'report': lambda ids: f'/report/{ids[len(ids) // 2]}',
+    'view_candidates': lambda ids: '/view_candidates',
+}
+
+def configure(scratch: str):
+    """Settings for the app, before it is imported: memory backend, scratch
+    files, no PDF cache (renders are what is measured), no outgoing requests.
+    Not done at import time: PDF render processes import this module too."""
+    # static/ and templates/ are found relative to the working directory
+    os.chdir(ROOT)
+    os.environ['DB_BACKEND'] = 'memory'
+    os.environ['DB_MEMORY_SEED_DIR'] = ''
+    os.environ.setdefault('PDF_CACHE_ENABLED', 'false')
+    os.environ['PDF_CACHE_DIR'] = os.path.join(scratch, 'pdf_cache')
+    os.environ['JOBS_DB_PATH'] = os.path.join(scratch, 'jobs.sqlite3')
+    os.environ['JOBS_DIR'] = os.path.join(scratch, 'jobs')
+    os.environ['GEOIP_ENABLED'] = 'false'
+    os.environ['KEEP_ALIVE_ENABLED'] = 'false'
+    os.environ.pop('KEEP_ALIVE_URL', None)
+
+def seed_backend(count: int):
+    """A fresh memory backend holding `count` candidates with checklists"""
+    import db
+    from backends import MemoryBackend
+    candidates, checklists = make_rows(count)
+    backend = MemoryBackend()
+    backend.seed(users=[{'user_id': 'admin', 'passcode': 'admin', 'role': 'admin', 'name': 'Admin'}],
+                 candidates=candidates.values(), checklists=checklists.values())
+    db.set_backend(backend)
+    return sorted(candidates)
+
+def client():
+    from app import app
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session['user_id'] = 'admin'
+        session['role'] = 'admin'
+        session['name'] = 'Admin'
+    return test_client
+
+def request_once(test_client, url: str):
+    started = time.perf_counter()
+    response = test_client.get(url)
+    data = response.get_data()
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return elapsed, len(data)
+
+def bench_route(test_client, url: str, repeat: int):
+    cold, size = request_once(test_client, url)
+    times = [request_once(test_client, url)[0] for _ in range(repeat)]
+    tracemalloc.start()
+    request_once(test_client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'cold_seconds': round(cold, 4),
+        'median_seconds': round(statistics.median(times), 4),
+        'min_seconds': round(min(times), 4),
+        'peak_memory_bytes': peak,
+        'output_bytes': size
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold: float):
+    """Lines for routes that got slower or bigger than `threshold` times the
+    baseline; the medians of tiny routes are noisy, so compare like with like"""
+    old = {(r['route'], r['candidates']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = old.get((result['route'], result['candidates']))
+        if before is None:
+            continue
+        for metric in ('median_seconds', 'peak_memory_bytes', 'output_bytes'):
+            if before[metric] and result[metric] / before[metric] > threshold:
+                regressions.append(f"{result['route']} @ {result['candidates']}: {metric} "
+                                   f"{before[metric]} -> {result[metric]} "
+                                   f"(x{result[metric] / before[metric]:.2f})")
+    return regressions
+
+def run(scales, routes, repeat: int, quiet: bool):
+    """Benchmark every route at every scale"""
+    results = []
+    for scale in scales:
+        ids = seed_backend(scale)
+        test_client = client()
+        for route in routes:
+            result = {'route': route, 'candidates': scale}
+            result.update(bench_route(test_client, ROUTES[route](ids), repeat))
+            results.append(result)
+            if not quiet:
+                print(f"{route:18} {scale:>6} candidates  cold {result['cold_seconds']:8.3f}s  "
+                      f"median {result['median_seconds']:8.3f}s  "
+                      f"peak {result['peak_memory_bytes'] / 1024 / 1024:7.1f} MB  "
+                      f"output {result['output_bytes'] / 1024:9.1f} KB", flush=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated candidate counts')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='comma-separated route names')
+    parser.add_argument('--repeat', type=int, default=3, help='timed requests per route and scale')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--json', action='store_true', help='print JSON results instead of a table')
+    parser.add_argument('--compare', help='baseline JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='ratio to the baseline reported as a regression')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    routes = [route for route in args.routes.split(',') if route]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    scratch = tempfile.mkdtemp(prefix='rms-bench-')
+    configure(scratch)
+    try:
+        results = run(scales, routes, args.repeat, args.json)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    import pdf_reports
+    report = {
+        'benchmark': 'routes',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'pdf_cache_enabled': os.environ['PDF_CACHE_ENABLED'] == 'true',
+        'pdf_render_processes': pdf_reports.PDF_RENDER_PROCESSES,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Startup benchmark: import time and first-request latency of a fresh worker
+Each run starts a new Python process (like a new or recycled gunicorn worker
+without preload_app), imports app with the in-memory storage backend, seeds
+it and requests each route twice: the first request includes loading lazy
+imports and compiling or loading the templates, the second shows the warm
+cost. The first run starts with an empty template bytecode cache
+(TEMPLATE_CACHE_DIR), later runs reuse it. -X importtime of the first run
+lists the slowest top-level imports.
+
+Usage: python benchmarks/startup.py [--runs 5] [--candidates 100]
+       [--routes ...] [--output results.json] [--json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Route name -> URL for a seeded table; 'login' is requested without a session
+ROUTES = {
+    'login': lambda ids: '/login',
+    'dashboard': lambda ids: '/dashboard',
+    'view_candidates': lambda ids: '/view_candidates',
+    'report': lambda ids: f'/report/{ids[len(ids) // 2]}',
+    'download_pdf': lambda ids: f'/download_pdf/{ids[len(ids) // 2]}',
+}
+# Modules whose loading the numbers are about
+HEAVY_MODULES = ('reportlab', 'requests', 'supabase', 'httpx')
+
+def child(scratch: str, candidates: int, routes):
+    """One fresh worker: prints its measurements as JSON"""
+    from routes import configure, seed_backend, client, request_once
+    configure(scratch)
+    os.environ['TEMPLATE_CACHE_DIR'] = os.path.join(scratch, 'template_cache')
+
+    started = time.perf_counter()
+    import app  # noqa: F401
+    import_seconds = time.perf_counter() - started
+    loaded_after_import = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    ids = seed_backend(candidates)
+    test_client = client()
+    timings = {}
+    for route in routes:
+        url = ROUTES[route](ids)
+        if route == 'login':
+            anonymous = app.app.test_client()
+            first, second = request_once(anonymous, url)[0], request_once(anonymous, url)[0]
+        else:
+            first, second = request_once(test_client, url)[0], request_once(test_client, url)[0]
+        timings[route] = {'first_seconds': round(first, 4), 'second_seconds': round(second, 4),
+                           'loaded': [name for name in HEAVY_MODULES if name in sys.modules]}
+    print(json.dumps({
+        'import_seconds': round(import_seconds, 4),
+        'loaded_after_import': loaded_after_import,
+        'requests': timings
+    }))
+
+def parse_importtime(stderr: str, top: int):
+    """Slowest top-level packages from -X importtime output"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        # The outermost import of a package carries the cumulative time of it all
+        totals[package] = max(totals.get(package, 0), int(cumulative))
+    ranked = sorted(totals.items(), key=lambda item: -item[1])
+    return [{'module': name, 'cumulative_ms': round(us / 1000, 1)} for name, us in ranked[:top]]
+
+def run_child(scratch: str, candidates: int, routes, importtime: bool):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += [os.path.abspath(__file__), '--child', scratch,
+                '--candidates', str(candidates), '--routes', ','.join(routes)]
+    started = time.perf_counter()
+    process = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"Worker run failed:\n{process.stderr[-2000:]}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['process_seconds'] = round(wall, 4)
+    if importtime:
+        result['slowest_imports'] = parse_importtime(process.stderr, 12)
+    return result
+
+def summarize(runs, routes):
+    """Medians over the runs with a warm template cache (all but the first)"""
+    warm = runs[1:] or runs
+    return {
+        'import_seconds': round(statistics.median(r['import_seconds'] for r in warm), 4),
+        'requests': {route: {
+            'first_seconds': round(statistics.median(r['requests'][route]['first_seconds'] for r in warm), 4),
+            'second_seconds': round(statistics.median(r['requests'][route]['second_seconds'] for r in warm), 4)
+        } for route in routes}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5, help='fresh worker processes to start')
+    parser.add_argument('--candidates', type=int, default=100, help='seeded candidates')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='comma-separated route names')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--json', action='store_true', help='print JSON results instead of a table')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    routes = [route for route in args.routes.split(',') if route]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+    if args.child:
+        child(args.child, args.candidates, routes)
+        return
+
+    scratch = tempfile.mkdtemp(prefix='rms-startup-')
+    try:
+        # The first run compiles the templates into the empty bytecode cache
+        runs = [run_child(scratch, args.candidates, routes, importtime=i == 0) for i in range(args.runs)]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        'benchmark': 'startup',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'candidates': args.candidates,
+        'runs': runs,
+        'summary': summarize(runs, routes)
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for i, result in enumerate(runs):
+        cache = 'cold' if i == 0 else 'warm'
+        print(f"run {i + 1} ({cache} template cache): import {result['import_seconds']:.3f}s, "
+              f"process {result['process_seconds']:.3f}s, "
+              f"loaded at import: {', '.join(result['loaded_after_import']) or 'none'}")
+        for route in routes:
+            timing = result['requests'][route]
+            print(f"  {route:16} first {timing['first_seconds']:7.3f}s  second {timing['second_seconds']:7.3f}s  "
+                  f"loaded: {', '.join(timing['loaded']) or 'none'}")
+    print("slowest imports (first run, -X importtime, includes the child's own imports):")
+    for item in runs[0]['slowest_imports']:
+        print(f"  {item['module']:24} {item['cumulative_ms']:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
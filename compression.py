@@ -0,0 +1,180 @@
+"""
+Response compression and precompressed static files
+Dynamic HTML, JSON and CSV responses above COMPRESSION_MIN_SIZE are
+compressed with brotli (when the brotli package is installed) or gzip,
+whichever the client prefers in Accept-Encoding. Static files are compressed
+once by `flask --app app precompress-static` (start_production.sh runs it);
+the static route then sends the .br / .gz file next to the original instead
+of compressing on every request.
+"""
+import gzip
+import os
+from typing import Iterable, List, Optional
+
+import click
+from flask import request, send_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+# Smaller bodies are sent as they are: the saving does not pay for the CPU
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+# gzip level (1-9) and brotli quality (0-11) of per-request compression
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript',
+    'application/json', 'application/javascript', 'image/svg+xml',
+})
+# Static files worth precompressing (images and PDFs are compressed already)
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.csv', '.txt', '.html', '.json', '.svg', '.xml', '.map')
+# Precompressed files smaller than this share of the original are kept
+PRECOMPRESS_MAX_RATIO = 0.9
+
+# Content-Encoding -> file suffix of precompressed static files
+_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def available_encodings() -> List[str]:
+    """Encodings this process can produce, preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY if level is None else level)
+    # mtime=0 keeps the output the same for the same input
+    return gzip.compress(data, COMPRESSION_LEVEL if level is None else level, mtime=0)
+
+def _negotiate(encodings: Iterable[str]) -> Optional[str]:
+    """The encoding to send, from the client's Accept-Encoding; on equal
+    q-values the server's order (brotli first) decides"""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _weaken_etag(response):
+    """A compressed body is a different representation with the same
+    meaning: keep the validator, but weak, so revalidations still match"""
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+def _static_variant(path: str, encodings: Iterable[str]) -> Optional[tuple]:
+    """(encoding, path) of an up-to-date precompressed copy of a static file"""
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    available = []
+    for encoding in encodings:
+        candidate = path + _SUFFIXES[encoding]
+        try:
+            # precompress_static() gives each copy its source's mtime
+            if os.stat(candidate).st_mtime_ns == source_mtime:
+                available.append(encoding)
+        except OSError:
+            continue
+    encoding = _negotiate(available)
+    return (encoding, path + _SUFFIXES[encoding]) if encoding else None
+
+def _compress_static(app, response):
+    filename = (request.view_args or {}).get('filename')
+    if not filename or response.status_code != 200 or 'Range' in request.headers:
+        return response
+    path = os.path.join(app.static_folder, filename)
+    if not os.path.realpath(path).startswith(os.path.realpath(app.static_folder) + os.sep):
+        return response
+    response.vary.add('Accept-Encoding')
+    variant = _static_variant(path, ['br', 'gzip'])
+    if variant is None:
+        return response
+    encoding, variant_path = variant
+    compressed = send_file(variant_path, mimetype=response.mimetype, conditional=False, etag=False)
+    for header in ('Last-Modified', 'ETag', 'Vary'):
+        if header in response.headers:
+            compressed.headers[header] = response.headers[header]
+    compressed.headers['Content-Encoding'] = encoding
+    _weaken_etag(compressed)
+    response.close()
+    return compressed
+
+def compress_response(response):
+    """Compress a buffered response body for this request, if worth it"""
+    if (response.direct_passthrough or response.is_streamed or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES or
+            'Content-Encoding' in response.headers or
+            response.status_code < 200 or response.status_code in (204, 206, 304) or
+            request.method == 'HEAD'):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESSION_MIN_SIZE:
+        return response
+    encoding = _negotiate(available_encodings())
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+def precompress_static(directory: str, min_size: int = COMPRESSION_MIN_SIZE) -> List[str]:
+    """Write .gz (and, with brotli installed, .br) copies of the compressible
+    files in `directory` at maximum compression; returns the files written.
+    Copies get the source's mtime, which is how stale copies are ignored."""
+    written = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.lower().endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            stat = os.stat(path)
+            for encoding in available_encodings():
+                level = 11 if encoding == 'br' else 9
+                output = path + _SUFFIXES[encoding]
+                compressed = compress(data, encoding, level)
+                if len(compressed) > len(data) * PRECOMPRESS_MAX_RATIO:
+                    if os.path.exists(output):
+                        os.remove(output)
+                    continue
+                with open(output, 'wb') as f:
+                    f.write(compressed)
+                os.utime(output, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                written.append(output)
+    return written
+
+def init_app(app):
+    """Compress responses and add the precompress-static command.
+
+    Register after http_cache.init_app: after_request hooks run in reverse
+    order, so its static cache headers land on the precompressed response.
+    """
+    @app.after_request
+    def compress_after_request(response):
+        if not COMPRESSION_ENABLED:
+            return response
+        if request.endpoint == 'static':
+            return _compress_static(app, response)
+        return compress_response(response)
+
+    @app.cli.command('precompress-static')
+    @click.option('--min-size', default=COMPRESSION_MIN_SIZE, show_default=True,
+                  help='Skip files smaller than this many bytes')
+    def precompress_static_command(min_size):
+        """Write .gz/.br copies of static files for the static route and nginx"""
+        written = precompress_static(app.static_folder, min_size)
+        for path in written:
+            click.echo(os.path.relpath(path, app.static_folder))
+        click.echo(f"{len(written)} precompressed files" +
+                   ('' if brotli is not None else ' (install brotli for .br files)'))
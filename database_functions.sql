@@ -0,0 +1,197 @@
+-- Database functions used by db.py
+-- Run in the Supabase SQL Editor after database_schema.sql.
+-- Safe to re-run: every object is created with CREATE OR REPLACE.
+
+-- ============================================================
+-- save_checklist_re26: save a checklist and its technical skills
+-- in one transaction (one RPC round trip from db.save_checklist).
+-- Skill rows whose (technology, skill_level) did not change are
+-- left untouched; only removed skills are deleted and only new
+-- ones inserted.
+-- ============================================================
+CREATE OR REPLACE FUNCTION save_checklist_re26(
+    p_register_id TEXT,
+    p_checklist JSONB,
+    p_skills JSONB
+) RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Update the existing checklist (trigger maintains updated_at) or create it
+    UPDATE checklists_re26 SET
+        practical_experience = COALESCE(p_checklist->>'practical_experience', ''),
+        communication_skills = COALESCE(p_checklist->>'communication_skills', ''),
+        time_management = COALESCE(p_checklist->>'time_management', ''),
+        leadership_ability = COALESCE(p_checklist->>'leadership_ability', ''),
+        interviewer_comments = COALESCE(p_checklist->>'interviewer_comments', ''),
+        faculty_comments = COALESCE(p_checklist->>'faculty_comments', ''),
+        interview_taken_by = COALESCE(p_checklist->>'interview_taken_by', ''),
+        reviewed_by = COALESCE(p_checklist->>'reviewed_by', ''),
+        remarks = COALESCE(p_checklist->>'remarks', '')
+    WHERE register_id = p_register_id;
+
+    IF NOT FOUND THEN
+        INSERT INTO checklists_re26 (
+            register_id, practical_experience, communication_skills, time_management,
+            leadership_ability, interviewer_comments, faculty_comments,
+            interview_taken_by, reviewed_by, remarks
+        ) VALUES (
+            p_register_id,
+            COALESCE(p_checklist->>'practical_experience', ''),
+            COALESCE(p_checklist->>'communication_skills', ''),
+            COALESCE(p_checklist->>'time_management', ''),
+            COALESCE(p_checklist->>'leadership_ability', ''),
+            COALESCE(p_checklist->>'interviewer_comments', ''),
+            COALESCE(p_checklist->>'faculty_comments', ''),
+            COALESCE(p_checklist->>'interview_taken_by', ''),
+            COALESCE(p_checklist->>'reviewed_by', ''),
+            COALESCE(p_checklist->>'remarks', '')
+        );
+    END IF;
+
+    -- Drop skills that are no longer listed
+    DELETE FROM technical_skills_re26 s
+    WHERE s.register_id = p_register_id
+      AND NOT EXISTS (
+          SELECT 1
+          FROM jsonb_to_recordset(p_skills) AS n(technology TEXT, skill_level TEXT)
+          WHERE n.technology = s.technology
+            AND n.skill_level IS NOT DISTINCT FROM s.skill_level
+      );
+
+    -- Add listed skills that are not stored yet
+    INSERT INTO technical_skills_re26 (register_id, technology, skill_level)
+    SELECT p_register_id, n.technology, n.skill_level
+    FROM jsonb_to_recordset(p_skills) AS n(technology TEXT, skill_level TEXT)
+    WHERE COALESCE(n.technology, '') <> ''
+      AND NOT EXISTS (
+          SELECT 1
+          FROM technical_skills_re26 s
+          WHERE s.register_id = p_register_id
+            AND s.technology = n.technology
+            AND s.skill_level IS NOT DISTINCT FROM n.skill_level
+      );
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION save_checklist_re26(TEXT, JSONB, JSONB) TO anon, authenticated;
+
+-- ============================================================
+-- checklists_with_skills_re26: each checklist row with its
+-- technical skills nested as a JSON array, so db.get_checklist
+-- and db.get_checklists need a single query.
+-- security_invoker keeps the row level security of the caller.
+-- ============================================================
+CREATE OR REPLACE VIEW checklists_with_skills_re26
+WITH (security_invoker = true) AS
+SELECT
+    c.*,
+    COALESCE(
+        (
+            SELECT jsonb_agg(jsonb_build_object(
+                'technology', s.technology,
+                'skill_level', s.skill_level
+            ))
+            FROM technical_skills_re26 s
+            WHERE s.register_id = c.register_id
+        ),
+        '[]'::jsonb
+    ) AS technical_skills
+FROM checklists_re26 c;
+
+GRANT SELECT ON checklists_with_skills_re26 TO anon, authenticated;
+
+-- ============================================================
+-- updated_at on users_re26 and candidates_re26, used as the
+-- incremental sync watermark of the local read replica
+-- (replica.py). checklists_re26 already maintains updated_at;
+-- technical skills are re-read whenever their checklist changes.
+-- Without these columns the replica copies the tables in full.
+-- ============================================================
+CREATE OR REPLACE FUNCTION set_updated_at_re26() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$;
+
+ALTER TABLE users_re26 ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE candidates_re26 ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+DROP TRIGGER IF EXISTS users_re26_set_updated_at ON users_re26;
+CREATE TRIGGER users_re26_set_updated_at
+    BEFORE UPDATE ON users_re26
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at_re26();
+
+DROP TRIGGER IF EXISTS candidates_re26_set_updated_at ON candidates_re26;
+CREATE TRIGGER candidates_re26_set_updated_at
+    BEFORE UPDATE ON candidates_re26
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at_re26();
+
+CREATE INDEX IF NOT EXISTS users_re26_updated_at ON users_re26 (updated_at);
+CREATE INDEX IF NOT EXISTS candidates_re26_updated_at ON candidates_re26 (updated_at);
+CREATE INDEX IF NOT EXISTS checklists_re26_updated_at ON checklists_re26 (updated_at);
+
+-- ============================================================
+-- positions on candidates_re26: the positions a candidate applied
+-- for as a text array, used by the position filter of candidate
+-- listings (PostgREST cs filter, GIN index). position_applied
+-- keeps the display text ("Core Member, Design Lead"); rows from
+-- before held a JSON array string there. The trigger derives both
+-- columns from whatever is written to position_applied, and the
+-- UPDATE converts the existing rows once (re-running it is a no-op).
+-- ============================================================
+ALTER TABLE candidates_re26 ADD COLUMN IF NOT EXISTS positions TEXT[] NOT NULL DEFAULT '{}';
+
+CREATE OR REPLACE FUNCTION parse_positions_re26(value TEXT) RETURNS TEXT[]
+LANGUAGE plpgsql IMMUTABLE
+AS $$
+BEGIN
+    IF value IS NULL OR btrim(value) = '' THEN
+        RETURN '{}';
+    END IF;
+    IF left(btrim(value), 1) = '[' THEN
+        BEGIN
+            RETURN ARRAY(
+                SELECT btrim(p.value)
+                FROM jsonb_array_elements_text(value::jsonb) WITH ORDINALITY AS p(value, n)
+                WHERE btrim(p.value) <> ''
+                ORDER BY p.n
+            );
+        EXCEPTION WHEN others THEN
+            NULL;  -- Not a JSON array after all: split it as text below
+        END;
+    END IF;
+    RETURN ARRAY(
+        SELECT btrim(p.value)
+        FROM unnest(string_to_array(value, ',')) WITH ORDINALITY AS p(value, n)
+        WHERE btrim(p.value) <> ''
+        ORDER BY p.n
+    );
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_positions_re26() RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.positions = parse_positions_re26(NEW.position_applied);
+    IF cardinality(NEW.positions) > 0 THEN
+        NEW.position_applied = array_to_string(NEW.positions, ', ');
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS candidates_re26_set_positions ON candidates_re26;
+CREATE TRIGGER candidates_re26_set_positions
+    BEFORE INSERT OR UPDATE OF position_applied ON candidates_re26
+    FOR EACH ROW EXECUTE FUNCTION set_positions_re26();
+
+-- One-time conversion of existing rows (fires the trigger above)
+UPDATE candidates_re26 SET position_applied = position_applied
+WHERE positions = '{}' AND btrim(COALESCE(position_applied, '')) <> '';
+
+CREATE INDEX IF NOT EXISTS candidates_re26_positions ON candidates_re26 USING GIN (positions);
@@ -1,41 +1,297 @@
 """
 Database module - Supabase integration
 Replaces JSON file operations with Supabase database calls
+The storage itself is pluggable (see backends.py and get_backend())
 """
-from supabase_config import get_supabase_client
+import base64
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+from backends import (
+    StorageBackend, SupabaseBackend, ReplicaBackend, MemoryBackend
+)
+from resilience import CircuitBreaker, RetryPolicy
+from records import Record, Candidate, Checklist, candidate_table, checklist_table, normalize_positions
+
+# Read-through cache for whole-table reads (seconds; 0 disables caching)
+CACHE_TTL = float(os.getenv('DB_CACHE_TTL', 10))
+CACHE_MAX_ENTRIES = int(os.getenv('DB_CACHE_MAX_ENTRIES', 64))
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed TTL"""
+    
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+    
+    def get(self, key):
+        """Return (True, value) for a live entry, else (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+    
+    def get_stale(self, key):
+        """Like get(), but expired entries are returned too.
+        
+        Expired entries stay until evicted or invalidated, so the last good
+        copy can be served while the database is unreachable.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self.stale_hits += 1
+            return True, entry[1]
+    
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries past the size bound"""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, *keys):
+        """Drop the given keys"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'stale_hits': self.stale_hits,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl
+            }
+
+_cache = TTLCache(CACHE_TTL, CACHE_MAX_ENTRIES)
+
+# Threads per process for running independent queries concurrently (1 disables)
+DB_PARALLEL_QUERIES = int(os.getenv('DB_PARALLEL_QUERIES', 4))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_pool_thread = threading.local()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return this process's query thread pool (threads do not survive fork)"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=DB_PARALLEL_QUERIES,
+                                           thread_name_prefix='db-query')
+            _executor_pid = os.getpid()
+        return _executor
+
+def _run_in_pool(call):
+    """Mark the pool thread so nested run_parallel() calls run inline"""
+    _pool_thread.active = True
+    return call()
+
+def run_parallel(*calls) -> List[Any]:
+    """Run independent zero-argument callables concurrently.
+    
+    Returns their results in argument order, so latency is that of the slowest
+    call rather than the sum. The first call runs in the calling thread, the
+    rest in a bounded pool. Calls made from inside the pool run sequentially to
+    avoid exhausting it. Exceptions are re-raised in the caller.
+    """
+    if len(calls) <= 1 or DB_PARALLEL_QUERIES <= 1 or getattr(_pool_thread, 'active', False):
+        return [call() for call in calls]
+    executor = _get_executor()
+    # Each call runs in a copy of the caller's context, which carries the
+    # request's retry budget (resilience.start_request_budget)
+    futures = [executor.submit(contextvars.copy_context().run, _run_in_pool, call) for call in calls[1:]]
+    first = calls[0]()
+    return [first] + [future.result() for future in futures]
+
+# Storage backend: 'supabase' (default) or 'memory' (offline, load tests)
+BACKEND = os.getenv('DB_BACKEND', 'supabase').lower()
+# Directory of sample_*.json files to seed the memory backend with
+MEMORY_SEED_DIR = os.getenv('DB_MEMORY_SEED_DIR', '')
+
+# Optional local SQLite read replica in front of Supabase (see replica.py):
+# reads are served from the file, writes go to Supabase and are synced back
+REPLICA_ENABLED = os.getenv('DB_REPLICA_ENABLED', 'false').lower() == 'true'
+REPLICA_PATH = os.getenv('DB_REPLICA_PATH', os.path.join('data', 'replica.sqlite3'))
+REPLICA_SYNC_INTERVAL = float(os.getenv('DB_REPLICA_SYNC_INTERVAL', 15))
+REPLICA_RECONCILE_INTERVAL = float(os.getenv('DB_REPLICA_RECONCILE_INTERVAL', 300))
+
+# Failure handling of Supabase calls (see resilience.py); request timeouts are
+# SUPABASE_TIMEOUT / SUPABASE_CONNECT_TIMEOUT in supabase_config.py
+READ_RETRIES = int(os.getenv('DB_READ_RETRIES', 2))
+RETRY_BASE_DELAY = float(os.getenv('DB_RETRY_BASE_DELAY', 0.2))
+RETRY_MAX_DELAY = float(os.getenv('DB_RETRY_MAX_DELAY', 2))
+# No retry starts once a call has taken this long (gunicorn kills at 30s)
+RETRY_BUDGET = float(os.getenv('DB_RETRY_BUDGET', 15))
+# ... nor once the request has spent this long, whatever number of calls it makes
+REQUEST_RETRY_BUDGET = float(os.getenv('DB_REQUEST_RETRY_BUDGET', 15))
+# Consecutive failures that open the circuit (0 disables), and seconds it stays open
+BREAKER_FAILURES = int(os.getenv('DB_BREAKER_FAILURES', 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv('DB_BREAKER_RESET_TIMEOUT', 30))
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def create_backend(name: str = BACKEND) -> StorageBackend:
+    """Build the storage backend named by configuration"""
+    if name == 'memory':
+        backend = MemoryBackend()
+        if MEMORY_SEED_DIR:
+            backend.load_json_dir(MEMORY_SEED_DIR)
+        return backend
+    if name != 'supabase':
+        raise ValueError(f"Unknown DB_BACKEND '{name}', expected 'supabase' or 'memory'")
+    breaker = CircuitBreaker('supabase', BREAKER_FAILURES, BREAKER_RESET_TIMEOUT)
+    retry = RetryPolicy(READ_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_BUDGET)
+    if REPLICA_ENABLED:
+        return ReplicaBackend(REPLICA_PATH, REPLICA_SYNC_INTERVAL, REPLICA_RECONCILE_INTERVAL,
+                              parallel=run_parallel, breaker=breaker, retry=retry)
+    return SupabaseBackend(parallel=run_parallel, breaker=breaker, retry=retry)
+
+def get_backend() -> StorageBackend:
+    """Return the process-wide storage backend, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+def set_backend(backend: StorageBackend):
+    """Swap the storage backend (benchmarks, profiling) and drop cached data"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    _cache.clear()
+
+def get_backend_status() -> Dict[str, Any]:
+    """State of the storage backend for monitoring"""
+    try:
+        return get_backend().status()
+    except Exception as e:
+        return {'backend': BACKEND, 'error': str(e)}
+
+# Keyset pagination of candidate listings
+CANDIDATES_PAGE_SIZE = int(os.getenv('CANDIDATES_PAGE_SIZE', 50))
+CANDIDATES_MAX_PAGE_SIZE = 200
+
+# Rows per request when bulk importing candidates
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+
+# Column projections per view, so listings never download every column
+# Orders of candidate listings; each is followed by register_id to be unique
+CANDIDATE_SORT_KEYS = ('register_id', 'candidate_name', 'department')
+
+CANDIDATE_VIEWS = {
+    'list': ['register_id', 'candidate_name', 'department', 'position_applied', 'phone_number'],
+    'summary': ['register_id', 'candidate_name', 'department', 'position_applied'],
+    'full': ['*']
+}
+
+def _cached_rows(key: str, loader) -> Dict[str, Dict]:
+    """Return a keyed table from the cache, loading it on a miss.
+    
+    Candidates and checklists are read-only records shared with the cache;
+    other rows are copied so mutating the result never leaks into the cached
+    data. Failed loads (empty results from the error
+    path) are not cached; the last good copy is served instead if there is one.
+    """
+    found, rows = _cache.get(key)
+    if not found:
+        rows = loader()
+        if rows is None:
+            found, rows = _cache.get_stale(key)
+            if not found:
+                return {}
+            print(f"Serving stale cached {key}")
+        else:
+            _cache.set(key, rows)
+    return {row_key: row if isinstance(row, Record) else dict(row) for row_key, row in rows.items()}
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the table cache"""
+    return _cache.stats()
+
+def clear_cache():
+    """Drop every cached table"""
+    _cache.clear()
+
+# Callbacks fn(table, register_id) run after a candidate or checklist write,
+# for state derived from those rows outside this module (rendered PDFs, ...)
+_change_listeners = []
+
+def add_change_listener(listener):
+    """Register a callback for candidate and checklist writes of this process"""
+    _change_listeners.append(listener)
+
+def _notify_change(table: str, register_id: str):
+    for listener in _change_listeners:
+        try:
+            listener(table, register_id)
+        except Exception as e:
+            print(f"Error in change listener: {e}")
 
 def get_user(user_id: str) -> Optional[Dict]:
     """Get a single user by user_id"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('users_re26').select('*').eq('user_id', user_id).execute()
-        if response.data:
-            return response.data[0]
-        return None
+        return get_backend().get_user(user_id)
     except Exception as e:
         print(f"Error getting user: {e}")
         return None
 
 def get_all_users() -> Dict[str, Dict]:
     """Get all users, returns as dict with user_id as key (for compatibility)"""
+    return _cached_rows('users', _load_all_users)
+
+def _load_all_users() -> Optional[Dict[str, Dict]]:
+    """Fetch the users table, None on error"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('users_re26').select('*').execute()
-        users_dict = {}
-        for user in response.data:
-            users_dict[user['user_id']] = user
-        return users_dict
+        return get_backend().get_all_users()
     except Exception as e:
         print(f"Error getting users: {e}")
-        return {}
+        return None
 
 def create_user(user_id: str, passcode: str, role: str, name: str) -> bool:
     """Create a new user"""
     try:
-        supabase = get_supabase_client()
-        supabase.table('users_re26').insert({
+        get_backend().create_user({
             'user_id': user_id,
             'passcode': passcode,
             'role': role,
@@ -44,7 +300,8 @@ def create_user(user_id: str, passcode: str, role: str, name: str) -> bool:
             'ip_address': None,
             'location': None,
             'isp': None
-        }).execute()
+        })
+        _cache.invalidate('users')
         return True
     except Exception as e:
         print(f"Error creating user: {e}")
@@ -53,8 +310,8 @@ def create_user(user_id: str, passcode: str, role: str, name: str) -> bool:
 def update_user(user_id: str, updates: Dict) -> bool:
     """Update user information"""
     try:
-        supabase = get_supabase_client()
-        supabase.table('users_re26').update(updates).eq('user_id', user_id).execute()
+        get_backend().update_user(user_id, updates)
+        _cache.invalidate('users')
         return True
     except Exception as e:
         print(f"Error updating user: {e}")
@@ -63,120 +320,273 @@ def update_user(user_id: str, updates: Dict) -> bool:
 def delete_user(user_id: str) -> bool:
     """Delete a user"""
     try:
-        supabase = get_supabase_client()
-        supabase.table('users_re26').delete().eq('user_id', user_id).execute()
+        get_backend().delete_user(user_id)
+        _cache.invalidate('users')
         return True
     except Exception as e:
         print(f"Error deleting user: {e}")
         return False
 
-def get_candidate(register_id: str) -> Optional[Dict]:
+def get_candidate(register_id: str) -> Optional[Candidate]:
     """Get a single candidate by register_id"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('candidates_re26').select('*').eq('register_id', register_id).execute()
-        if response.data:
-            return response.data[0]
-        return None
+        row = get_backend().get_candidate(register_id)
+        return Candidate.from_row(row) if row else None
     except Exception as e:
         print(f"Error getting candidate: {e}")
         return None
 
-def get_all_candidates() -> Dict[str, Dict]:
+def get_all_candidates() -> Dict[str, Candidate]:
     """Get all candidates, returns as dict with register_id as key"""
+    return _cached_rows('candidates', _load_all_candidates)
+
+def _load_all_candidates() -> Optional[Dict[str, Candidate]]:
+    """Fetch the candidates table, None on error"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('candidates_re26').select('*').execute()
-        candidates_dict = {}
-        for candidate in response.data:
-            candidates_dict[candidate['register_id']] = candidate
-        return candidates_dict
+        return candidate_table(get_backend().get_all_candidates())
     except Exception as e:
         print(f"Error getting candidates: {e}")
-        return {}
+        return None
+
+def _encode_cursor(row: Dict, sort: str) -> str:
+    if sort == 'register_id':
+        return row['register_id']
+    key = json.dumps([row.get(sort), row['register_id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    """(sort value, register_id) of a cursor; ValueError when it is malformed"""
+    if sort == 'register_id':
+        return (cursor, cursor)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        value, register_id = key
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor for sort '{sort}'") from e
+    return (value, register_id)
+
+def parse_candidate_sort(sort: Optional[str]) -> tuple:
+    """(column, descending) of a sort parameter such as 'candidate_name' or
+    '-department'; ValueError for columns outside CANDIDATE_SORT_KEYS"""
+    sort = (sort or 'register_id').strip()
+    descending = sort.startswith('-')
+    column = sort.lstrip('-')
+    if column not in CANDIDATE_SORT_KEYS:
+        raise ValueError(f"Unknown sort key '{column}', expected one of {', '.join(CANDIDATE_SORT_KEYS)}")
+    return column, descending
+
+def get_candidates_page(after: Optional[str] = None, before: Optional[str] = None,
+                        limit: int = CANDIDATES_PAGE_SIZE, department: Optional[str] = None,
+                        status: Optional[str] = None, view: str = 'list',
+                        search: Optional[str] = None, position: Optional[str] = None,
+                        sort: Optional[str] = None) -> Dict[str, Any]:
+    """Get one page of candidates ordered by `sort` (see parse_candidate_sort),
+    then register_id.
+    
+    Pages are addressed by keyset cursors: pass a page's next_cursor as `after`
+    for the next page, or its prev_cursor as `before` for the previous page.
+    With the default order a cursor is a register_id. Department, checklist
+    status ('completed' / 'pending'), text search and position (one of the
+    candidate's positions, exactly) filters run in the database, and only the
+    columns of `view` (see CANDIDATE_VIEWS) are fetched. Every returned
+    candidate carries a `has_checklist` flag.
+    
+    Returns {'candidates': {register_id: candidate}, 'next_cursor': ...,
+    'prev_cursor': ...}; a cursor is None when there is no such page. Raises
+    ValueError for an unknown sort key or a malformed cursor.
+    """
+    limit = max(1, min(int(limit), CANDIDATES_MAX_PAGE_SIZE))
+    sort_column, descending = parse_candidate_sort(sort)
+    after_key = _decode_cursor(after, sort_column) if after else None
+    before_key = _decode_cursor(before, sort_column) if before else None
+    columns = CANDIDATE_VIEWS.get(view, CANDIDATE_VIEWS['list'])
+    # Cursors are built from the sort column
+    if columns != ['*'] and sort_column not in columns:
+        columns = columns + [sort_column]
+    page = {'candidates': {}, 'next_cursor': None, 'prev_cursor': None}
+    try:
+        # Fetch one extra row to learn whether another page exists
+        rows = get_backend().fetch_candidates_page(
+            after_key, before_key, limit + 1, department, status, columns,
+            search=search or None, position=position or None, sort=sort_column, descending=descending)
+    except Exception as e:
+        print(f"Error getting candidates page: {e}")
+        return page
+    
+    backwards = before_key is not None and after_key is None
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+    
+    for row in rows:
+        page['candidates'][row['register_id']] = Candidate.from_row(row)
+    
+    if rows:
+        first, last = _encode_cursor(rows[0], sort_column), _encode_cursor(rows[-1], sort_column)
+        if backwards:
+            page['prev_cursor'] = first if has_more else None
+            page['next_cursor'] = last
+        else:
+            page['prev_cursor'] = first if after_key is not None else None
+            page['next_cursor'] = last if has_more else None
+    return page
+
+def get_candidate_departments() -> List[str]:
+    """Get the sorted distinct departments of all candidates (for filter menus)"""
+    found, departments = _cache.get('departments')
+    if found:
+        return list(departments)
+    try:
+        departments = get_backend().get_candidate_departments()
+        _cache.set('departments', departments)
+        return list(departments)
+    except Exception as e:
+        print(f"Error getting departments: {e}")
+        found, departments = _cache.get_stale('departments')
+        return list(departments) if found else []
 
 def create_candidate(candidate_data: Dict) -> bool:
     """Create a new candidate"""
     try:
-        supabase = get_supabase_client()
-        supabase.table('candidates_re26').insert(candidate_data).execute()
+        get_backend().create_candidate(normalize_positions(candidate_data))
+        _cache.invalidate('candidates', 'departments', 'dashboard_counts')
+        _notify_change('candidates', candidate_data['register_id'])
         return True
     except Exception as e:
         print(f"Error creating candidate: {e}")
         return False
 
+def get_candidate_ids() -> set:
+    """Get the register_id of every candidate, without the other columns"""
+    try:
+        return get_backend().get_candidate_ids()
+    except Exception as e:
+        print(f"Error getting candidate ids: {e}")
+        return set()
+
+def bulk_create_candidates(candidates: List[Dict], chunk_size: int = IMPORT_CHUNK_SIZE,
+                           progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Insert many candidates in chunks, skipping register_ids that already exist.
+    
+    Each chunk is a single upsert with ON CONFLICT (register_id) DO NOTHING, so
+    duplicates are resolved by the database. When a chunk fails, its rows are
+    retried one by one to find the rows at fault. `progress(done, total)` is
+    called after each chunk.
+    
+    Returns {'inserted': [register_id, ...], 'duplicates': [register_id, ...],
+    'failed': {register_id: error_message}}.
+    """
+    result = {'inserted': [], 'duplicates': [], 'failed': {}}
+    if not candidates:
+        return result
+    # Positions are stored normalized (display text plus the positions array)
+    candidates = [normalize_positions(candidate) for candidate in candidates]
+    chunk_size = max(1, chunk_size)
+    backend = get_backend()
+    
+    def insert(rows):
+        inserted = backend.insert_candidates(rows)
+        for row in rows:
+            if row['register_id'] in inserted:
+                result['inserted'].append(row['register_id'])
+            else:
+                result['duplicates'].append(row['register_id'])
+    
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        try:
+            insert(chunk)
+        except Exception as chunk_error:
+            print(f"Error importing candidates chunk at row {start}: {chunk_error}")
+            for row in chunk:
+                try:
+                    insert([row])
+                except Exception as e:
+                    result['failed'][row['register_id']] = str(e)
+        if progress:
+            progress(start + len(chunk), len(candidates))
+    
+    _cache.invalidate('candidates', 'departments', 'dashboard_counts')
+    for register_id in result['inserted']:
+        _notify_change('candidates', register_id)
+    return result
+
 def update_candidate(register_id: str, updates: Dict) -> bool:
     """Update candidate information"""
     try:
-        supabase = get_supabase_client()
-        supabase.table('candidates_re26').update(updates).eq('register_id', register_id).execute()
+        get_backend().update_candidate(register_id, normalize_positions(updates))
+        _cache.invalidate('candidates', 'departments')
+        _notify_change('candidates', register_id)
         return True
     except Exception as e:
         print(f"Error updating candidate: {e}")
         return False
 
-def get_checklist(register_id: str) -> Optional[Dict]:
+def get_checklist(register_id: str) -> Optional[Checklist]:
     """Get checklist for a candidate, including technical skills"""
     try:
-        supabase = get_supabase_client()
-        # Get checklist
-        checklist_response = supabase.table('checklists_re26').select('*').eq('register_id', register_id).execute()
-        
-        if not checklist_response.data:
-            return None
-        
-        checklist = checklist_response.data[0]
-        
-        # Get technical skills
-        skills_response = supabase.table('technical_skills_re26').select('*').eq('register_id', register_id).execute()
-        checklist['technical_skills'] = [
-            {'technology': skill['technology'], 'skill_level': skill['skill_level']}
-            for skill in skills_response.data
-        ]
-        
-        return checklist
+        row = get_backend().get_checklists([register_id]).get(register_id)
+        return Checklist.from_row(row) if row else None
     except Exception as e:
         print(f"Error getting checklist: {e}")
         return None
 
-def get_all_checklists() -> Dict[str, Dict]:
-    """Get all checklists with technical skills"""
+def get_checklists(register_ids: List[str]) -> Dict[str, Checklist]:
+    """Get checklists for several candidates at once, keyed by register_id.
+    
+    Candidates without a checklist are simply absent from the result.
+    """
     try:
-        supabase = get_supabase_client()
-        # Get all checklists
-        checklists_response = supabase.table('checklists_re26').select('*').execute()
-        
-        # Get all technical skills
-        skills_response = supabase.table('technical_skills_re26').select('*').execute()
-        
-        # Group skills by register_id
-        skills_by_register = {}
-        for skill in skills_response.data:
-            register_id = skill['register_id']
-            if register_id not in skills_by_register:
-                skills_by_register[register_id] = []
-            skills_by_register[register_id].append({
-                'technology': skill['technology'],
-                'skill_level': skill['skill_level']
-            })
-        
-        # Combine checklists with skills
-        checklists_dict = {}
-        for checklist in checklists_response.data:
-            register_id = checklist['register_id']
-            checklist['technical_skills'] = skills_by_register.get(register_id, [])
-            checklists_dict[register_id] = checklist
-        
-        return checklists_dict
+        return checklist_table(get_backend().get_checklists(list(dict.fromkeys(register_ids))))
     except Exception as e:
         print(f"Error getting checklists: {e}")
         return {}
 
+def get_all_checklists() -> Dict[str, Checklist]:
+    """Get all checklists with technical skills"""
+    return _cached_rows('checklists', _load_all_checklists)
+
+def _load_all_checklists() -> Optional[Dict[str, Checklist]]:
+    """Fetch checklists joined with their technical skills, None on error"""
+    try:
+        return checklist_table(get_backend().get_checklists())
+    except Exception as e:
+        print(f"Error getting checklists: {e}")
+        return None
+
+def get_dashboard_stats(role: str) -> Dict[str, int]:
+    """Get dashboard counts for a role using exact count queries.
+    
+    For faculty reviewers `total` is the number of checklists, `completed` the
+    checklists with faculty comments and `pending` the rest. For everyone else
+    `total` is the number of candidates, `completed` the checklists and
+    `pending` the candidates still without one.
+    """
+    found, counts = _cache.get('dashboard_counts')
+    if not found:
+        try:
+            counts = get_backend().get_dashboard_counts()
+            _cache.set('dashboard_counts', counts)
+        except Exception as e:
+            print(f"Error getting dashboard stats: {e}")
+            found, counts = _cache.get_stale('dashboard_counts')
+            if not found:
+                counts = {'candidates': 0, 'checklists': 0, 'faculty_reviewed': 0}
+    
+    if role == 'faculty_reviewer':
+        total, completed = counts['checklists'], counts['faculty_reviewed']
+    else:
+        total, completed = counts['candidates'], counts['checklists']
+    return {'total': total, 'completed': completed, 'pending': max(total - completed, 0)}
+
 def save_checklist(register_id: str, checklist_data: Dict) -> bool:
-    """Save or update a checklist with technical skills"""
+    """Save or update a checklist with technical skills.
+    
+    On Supabase this is one transactional RPC (save_checklist_re26) that
+    rewrites only the skills that changed.
+    """
     try:
-        supabase = get_supabase_client()
-        
         # Extract technical skills
         technical_skills = checklist_data.pop('technical_skills', [])
         
@@ -195,34 +605,23 @@ def save_checklist(register_id: str, checklist_data: Dict) -> bool:
             'remarks': checklist_data.get('remarks', '')
         }
         
-        # Check if checklist exists
-        existing = supabase.table('checklists_re26').select('checklist_id').eq('register_id', register_id).execute()
-        
-        if existing.data:
-            # Update existing checklist (trigger will auto-update updated_at)
-            supabase.table('checklists_re26').update(checklist_record).eq('register_id', register_id).execute()
-        else:
-            # Create new checklist (defaults will set created_at and updated_at)
-            supabase.table('checklists_re26').insert(checklist_record).execute()
-        
-        # Delete existing technical skills for this register_id
-        supabase.table('technical_skills_re26').delete().eq('register_id', register_id).execute()
-        
-        # Insert new technical skills
-        if technical_skills:
-            skills_to_insert = [
-                {
-                    'register_id': register_id,
-                    'technology': skill['technology'],
-                    'skill_level': skill['skill_level']
-                }
-                for skill in technical_skills if skill.get('technology')
-            ]
-            if skills_to_insert:
-                supabase.table('technical_skills_re26').insert(skills_to_insert).execute()
+        # Skills without a technology are dropped, repeated ones stored once
+        skills = []
+        seen = set()
+        for skill in technical_skills or []:
+            pair = (skill.get('technology'), skill.get('skill_level'))
+            if pair[0] and pair not in seen:
+                seen.add(pair)
+                skills.append({'technology': pair[0], 'skill_level': pair[1]})
         
+        get_backend().save_checklist(register_id, checklist_record, skills)
+        _cache.invalidate('checklists', 'dashboard_counts')
+        _notify_change('checklists', register_id)
         return True
     except Exception as e:
+        # A partial save may already have touched the tables
+        _cache.invalidate('checklists', 'dashboard_counts')
+        _notify_change('checklists', register_id)
         print(f"Error saving checklist: {e}")
         return False
 
@@ -237,4 +636,3 @@ def init_default_user():
     except Exception as e:
         print(f"Error initializing default user: {e}")
         return False
-
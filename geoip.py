@@ -0,0 +1,197 @@
+"""
+IP geolocation of logins, resolved in the background
+login() only queues the lookup; a worker thread resolves it (offline GeoIP
+database first when configured, then ip-api.com) and stores the result on the
+user with update_user(). Results are cached per IP, so repeated logins from the
+same address are answered without any lookup.
+"""
+import ipaddress
+import os
+import queue
+import threading
+from typing import Dict, Optional, Any
+
+from db import TTLCache, update_user
+
+GEOIP_ENABLED = os.getenv('GEOIP_ENABLED', 'true').lower() == 'true'
+# Resolved IPs kept per process, and for how long (seconds)
+GEOIP_CACHE_SIZE = int(os.getenv('GEOIP_CACHE_SIZE', 1024))
+GEOIP_CACHE_TTL = float(os.getenv('GEOIP_CACHE_TTL', 24 * 60 * 60))
+# Lookups waiting for the worker; further logins are not geolocated while full
+GEOIP_QUEUE_SIZE = int(os.getenv('GEOIP_QUEUE_SIZE', 256))
+# Optional MaxMind databases (GeoLite2-City / GeoLite2-ASN .mmdb, needs geoip2)
+GEOIP_CITY_DB = os.getenv('GEOIP_CITY_DB', '')
+GEOIP_ASN_DB = os.getenv('GEOIP_ASN_DB', '')
+# Online fallback; disable for fully offline deployments
+GEOIP_API_ENABLED = os.getenv('GEOIP_API_ENABLED', 'true').lower() == 'true'
+GEOIP_API_TIMEOUT = float(os.getenv('GEOIP_API_TIMEOUT', 5))
+# Longest the worker waits for the login's own write before storing a result
+# (the gunicorn worker timeout)
+LOGIN_WRITE_WAIT = 30
+
+# Shown until the worker has resolved a login
+PENDING = 'Pending'
+UNKNOWN = 'Unknown'
+
+def client_ip(request) -> str:
+    """The client address, honouring the first X-Forwarded-For hop"""
+    forwarded = request.headers.get('X-Forwarded-For')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.remote_addr
+
+def _is_public(ip: str) -> bool:
+    try:
+        return ipaddress.ip_address(ip).is_global
+    except ValueError:
+        return False
+
+class OfflineResolver:
+    """Lookups in local MaxMind databases"""
+    name = 'offline'
+
+    def __init__(self, city_path: str, asn_path: str = ''):
+        import geoip2.database
+        self.city = geoip2.database.Reader(city_path) if city_path else None
+        self.asn = geoip2.database.Reader(asn_path) if asn_path else None
+
+    def resolve(self, ip: str) -> Optional[Dict[str, str]]:
+        import geoip2.errors
+        info = {'ip': ip, 'location': UNKNOWN, 'isp': UNKNOWN}
+        found = False
+        try:
+            if self.city:
+                city = self.city.city(ip)
+                location_parts = [p for p in [city.city.name, city.subdivisions.most_specific.name,
+                                              city.country.name] if p]
+                if location_parts:
+                    info['location'] = ', '.join(location_parts)
+                    found = True
+            if self.asn:
+                isp = self.asn.asn(ip).autonomous_system_organization
+                if isp:
+                    info['isp'] = isp
+                    found = True
+        except geoip2.errors.AddressNotFoundError:
+            pass
+        return info if found else None
+
+class IpApiResolver:
+    """ip-api.com (free, no API key required)"""
+    name = 'ip-api'
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+
+    def resolve(self, ip: str) -> Optional[Dict[str, str]]:
+        import requests
+        response = requests.get(f'http://ip-api.com/json/{ip}?fields=status,country,regionName,city,isp,query',
+                                timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if data.get('status') != 'success':
+            return None
+        location_parts = [p for p in [data.get('city', ''), data.get('regionName', ''), data.get('country', '')] if p]
+        return {
+            'ip': data.get('query', ip),
+            'location': ', '.join(location_parts) if location_parts else UNKNOWN,
+            'isp': data.get('isp', UNKNOWN)
+        }
+
+class GeoLocator:
+    """Background geolocation with an LRU/TTL cache keyed by IP"""
+
+    def __init__(self):
+        self.cache = TTLCache(GEOIP_CACHE_TTL, GEOIP_CACHE_SIZE)
+        self.resolvers = []
+        if GEOIP_CITY_DB or GEOIP_ASN_DB:
+            try:
+                self.resolvers.append(OfflineResolver(GEOIP_CITY_DB, GEOIP_ASN_DB))
+            except Exception as e:
+                print(f"Offline GeoIP database unavailable ({e}), install geoip2 and check GEOIP_CITY_DB")
+        if GEOIP_API_ENABLED:
+            self.resolvers.append(IpApiResolver(GEOIP_API_TIMEOUT))
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.resolved = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def cached(self, ip: str) -> Optional[Dict[str, str]]:
+        """The known location of an IP, without any lookup"""
+        if not _is_public(ip):
+            return {'ip': ip, 'location': UNKNOWN, 'isp': UNKNOWN}
+        found, info = self.cache.get(ip)
+        return dict(info) if found else None
+
+    def submit(self, user_id: str, ip: str, written: Optional[threading.Event] = None) -> bool:
+        """Queue a lookup whose result is written to the user once `written`
+        is set (the login's own write, which must not overwrite the result);
+        False when the queue is full and nothing will be written"""
+        try:
+            self._worker_queue().put_nowait((user_id, ip, written))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"GeoIP queue full, not locating login of {user_id}")
+            return False
+
+    def resolve(self, ip: str) -> Dict[str, str]:
+        """Look an IP up now (worker thread), trying each resolver in turn"""
+        info = self.cached(ip)
+        if info is not None:
+            return info
+        for resolver in self.resolvers:
+            try:
+                info = resolver.resolve(ip)
+            except Exception as e:
+                print(f"GeoIP lookup of {ip} via {resolver.name} failed: {e}")
+                info = None
+            if info:
+                self.cache.set(ip, info)
+                self.resolved += 1
+                return dict(info)
+        self.failed += 1
+        return {'ip': ip, 'location': UNKNOWN, 'isp': UNKNOWN}
+
+    def _worker_queue(self) -> queue.Queue:
+        """This process's job queue; the worker thread does not survive fork"""
+        if self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=GEOIP_QUEUE_SIZE)
+                threading.Thread(target=self._work, args=(self._queue,), daemon=True,
+                                 name='geoip').start()
+                self._pid = os.getpid()
+            return self._queue
+
+    def _work(self, jobs: queue.Queue):
+        while True:
+            user_id, ip, written = jobs.get()
+            try:
+                info = self.resolve(ip)
+                if written is not None:
+                    written.wait(LOGIN_WRITE_WAIT)
+                update_user(user_id, {'ip_address': info['ip'], 'location': info['location'],
+                                      'isp': info['isp']})
+            except Exception as e:
+                print(f"GeoIP worker error: {e}")
+            finally:
+                jobs.task_done()
+
+    def status(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            'enabled': GEOIP_ENABLED,
+            'resolvers': [resolver.name for resolver in self.resolvers],
+            'queued': self._queue.qsize() if self._pid == os.getpid() else 0,
+            'resolved': self.resolved,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'cache': self.cache.stats()
+        }
+
+geolocator = GeoLocator()
@@ -54,6 +54,13 @@ statsd_prefix = 'gunicorn'
 def when_ready(server):
     """Called just after the server is started"""
     server.log.info("Server is ready. Spawning workers")
+    # Decode the PDF images and compile the templates in the master so
+    # forked (and recycled, see max_requests) workers start with them loaded
+    if preload_app:
+        from pdf_resources import warm_up
+        warm_up()
+        from app import warm_up_templates
+        warm_up_templates()
 
 def on_exit(server):
     """Called just before exiting"""
@@ -70,10 +77,7 @@ def pre_fork(server, worker):
 def post_fork(server, worker):
     """Called just after a worker has been forked"""
     server.log.info("Worker spawned (pid: %s)", worker.pid)
-
-def post_worker_init(worker):
-    """Called just after a worker has initialized the application"""
-    # Initialize default user on startup
-    from app import init_default_user
-    init_default_user()
+    # preload_app builds the Supabase client in the master; give each worker its own pool
+    from supabase_config import reset_supabase_client
+    reset_supabase_client()
 
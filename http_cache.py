@@ -0,0 +1,139 @@
+"""
+HTTP caching: conditional data pages and fingerprinted static files
+Data pages get an ETag and Last-Modified built from the updated_at of the
+rows they show (plus the viewer and the deployed templates), so a browser
+revalidating an unchanged page gets a 304 without the page being rendered.
+Static URLs carry a hash of the file (?v=...), which lets browsers and nginx
+cache them for a year: a changed file gets a new URL.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+from flask import current_app, request, session, make_response
+from werkzeug.http import is_resource_modified
+
+# Cache lifetime of fingerprinted static files (seconds)
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 365 * 24 * 60 * 60))
+
+_fingerprints = {}
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """Short content hash of a file, recomputed only when it changes on disk"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        fingerprint = digest.hexdigest()[:12]
+        _fingerprints[key] = fingerprint
+    return fingerprint
+
+def _directory_fingerprint(directory: str) -> str:
+    digest = hashlib.sha256()
+    for root, _, files in sorted(os.walk(directory)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(path.encode('utf-8'))
+            digest.update((file_fingerprint(path) or '').encode('ascii'))
+    return digest.hexdigest()[:12]
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """updated_at as a UTC datetime; naive timestamps are taken as UTC"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def row_version(row) -> str:
+    """What identifies a row's version: its updated_at, or its content for
+    rows (or tables) without one"""
+    if row is None:
+        return '-'
+    updated_at = row.get('updated_at')
+    if updated_at:
+        # Skills live in their own table and do not touch the checklist's updated_at
+        return repr((str(updated_at), row.get('technical_skills')))
+    return repr(sorted((key, repr(value)) for key, value in row.items()))
+
+_page_versions = {}
+
+def page_version() -> str:
+    """Hash of the deployed templates and static files; computed once per
+    process (on every call in debug mode, where templates are edited live)"""
+    app = current_app._get_current_object()
+    version = _page_versions.get(app.name)
+    if version is None or app.debug:
+        version = _page_versions[app.name] = (_directory_fingerprint(os.path.join(app.root_path, app.template_folder)) +
+                                              _directory_fingerprint(app.static_folder))
+    return version
+
+def init_app(app):
+    """Fingerprint url_for('static', ...) and serve those URLs as immutable"""
+    @app.url_defaults
+    def static_fingerprint(endpoint, values):
+        if endpoint == 'static' and 'v' not in values and 'filename' in values:
+            fingerprint = file_fingerprint(os.path.join(app.static_folder, values['filename']))
+            if fingerprint:
+                values['v'] = fingerprint
+
+    @app.after_request
+    def static_cache_headers(response):
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            version = request.args.get('v')
+            filename = (request.view_args or {}).get('filename', '')
+            if version and version == file_fingerprint(os.path.join(app.static_folder, filename)):
+                response.cache_control.no_cache = None
+                response.cache_control.public = True
+                response.cache_control.max_age = STATIC_MAX_AGE
+                response.cache_control.immutable = True
+        return response
+
+def conditional_page(rows: Iterable, render: Callable[[], str], *extra):
+    """Response for a page showing `rows` (records / dicts, None allowed).
+
+    The ETag covers the rows' versions, the viewer (pages differ by role and
+    name), the deployed templates and any `extra` values such as query
+    arguments; Last-Modified is the newest updated_at. A matching
+    If-None-Match / If-Modified-Since gets a 304 and `render` is not called.
+    """
+    rows = list(rows)
+    validator = repr((
+        page_version(), request.endpoint,
+        session.get('user_id'), session.get('role'), session.get('name'),
+        [row_version(row) for row in rows],
+        extra
+    ))
+    etag = hashlib.sha256(validator.encode('utf-8')).hexdigest()[:32]
+    timestamps = [_parse_timestamp(row.get('updated_at')) for row in rows if row is not None]
+    timestamps = [t for t in timestamps if t is not None]
+    # Only rows that all carry updated_at make a trustworthy Last-Modified
+    last_modified = max(timestamps) if timestamps and len(timestamps) == len(rows) else None
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Pages are per user and must be revalidated on every view
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
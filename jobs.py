@@ -0,0 +1,326 @@
+"""
+Background jobs for long exports and imports
+Requests submit a job and get its id back right away; worker threads run it
+and record progress in a local SQLite table that every worker process on the
+host shares, so any worker can answer status polls and serve the finished
+file. Each job writes its files to its own directory under JOBS_DIR; finished
+jobs are removed after JOBS_RETENTION_HOURS.
+"""
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Any
+
+JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', os.path.join('data', 'jobs.sqlite3'))
+JOBS_DIR = os.getenv('JOBS_DIR', os.path.join('data', 'jobs'))
+# Job threads per web worker process
+JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', 1))
+# Seconds between checks for jobs submitted by other processes
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 2))
+JOBS_RETENTION_HOURS = float(os.getenv('JOBS_RETENTION_HOURS', 24))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Progress is written at most this often (seconds), except the final update
+PROGRESS_INTERVAL = 0.5
+# Seconds between clean-ups of expired and interrupted jobs
+CLEANUP_INTERVAL = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    file_path TEXT,
+    download_name TEXT,
+    mimetype TEXT,
+    host TEXT,
+    pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+HOST = socket.gethostname()
+
+_handlers: Dict[str, Callable] = {}
+
+def register_job(kind: str):
+    """Decorator registering the function that runs jobs of `kind`.
+
+    The function receives a Job and may return a dict with 'file' (a path in
+    job.directory), 'download_name', 'mimetype', 'message' and any other
+    JSON-serialisable summary for the status endpoint.
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class Job:
+    """What a handler sees of the job it runs"""
+
+    def __init__(self, runner: 'JobRunner', row: sqlite3.Row):
+        self.runner = runner
+        self.job_id = row['job_id']
+        self.kind = row['kind']
+        self.owner = row['owner']
+        self.params = json.loads(row['params'])
+        self.directory = runner.job_dir(self.job_id)
+        self._written_at = 0.0
+
+    def path(self, filename: str) -> str:
+        """Path of a file in the job's directory"""
+        return os.path.join(self.directory, filename)
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress; cheap to call often, writes are throttled"""
+        now = time.monotonic()
+        if now - self._written_at < PROGRESS_INTERVAL and (total is None or done < total):
+            return
+        self._written_at = now
+        fields = {'done': done}
+        if total is not None:
+            fields['total'] = total
+        if message is not None:
+            fields['message'] = message
+        self.runner._update(self.job_id, fields)
+
+class JobRunner:
+    """Job table plus the worker threads of this process"""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, directory: str = JOBS_DIR,
+                 workers: int = JOBS_WORKERS):
+        self.db_path = db_path
+        self.directory = directory
+        self.workers = workers
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._cleaned_at = 0.0
+        self.completed = 0
+        self.failed = 0
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection (connections must not cross fork or threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    # ------------------------------------------------------------------
+    # Used by request handlers
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, params: Optional[Dict] = None, owner: Optional[str] = None,
+               job_id: Optional[str] = None) -> str:
+        """Queue a job and return its id. Pass a job_id from new_job_id() when
+        input files were saved to job_dir() before submitting."""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = job_id or self.new_job_id()
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, owner, status, params, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, owner, QUEUED, json.dumps(params or {}), time.time()))
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job as a JSON-ready dict, or None"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        return {
+            'job_id': row['job_id'],
+            'kind': row['kind'],
+            'owner': row['owner'],
+            'status': row['status'],
+            'done': row['done'],
+            'total': row['total'],
+            'percent': round(100 * row['done'] / row['total'], 1) if row['total'] else None,
+            'message': row['message'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'has_file': bool(row['file_path']),
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+            'elapsed': round((row['finished_at'] or now) - row['started_at'], 1) if row['started_at'] else None
+        }
+
+    def result_file(self, job_id: str) -> Optional[Dict[str, str]]:
+        """{'path', 'download_name', 'mimetype'} of a finished job's file"""
+        row = self._connect().execute(
+            "SELECT file_path, download_name, mimetype FROM jobs WHERE job_id = ? AND status = ?",
+            (job_id, DONE)).fetchone()
+        if row is None or not row['file_path'] or not os.path.exists(row['file_path']):
+            return None
+        return {'path': row['file_path'], 'download_name': row['download_name'],
+                'mimetype': row['mimetype'] or 'application/octet-stream'}
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start this process's worker threads (once per pid; threads do not
+        survive fork, so call it from the serving process)"""
+        if self._pid == os.getpid() or self.workers <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._wakeup = threading.Event()
+            for i in range(self.workers):
+                threading.Thread(target=self._work, daemon=True, name=f'jobs-{i}').start()
+            self._pid = os.getpid()
+
+    def _work(self):
+        while True:
+            try:
+                self._maybe_cleanup()
+                row = self._claim()
+            except Exception as e:
+                print(f"Job queue error: {e}")
+                row = None
+            if row is None:
+                self._wakeup.wait(JOBS_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._run(row)
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Take the oldest queued job; the write lock makes the claim atomic
+        across processes"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                               (QUEUED,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = ?, host = ?, pid = ?, started_at = ? WHERE job_id = ?",
+                             (RUNNING, HOST, os.getpid(), time.time(), row['job_id']))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _run(self, row: sqlite3.Row):
+        job = Job(self, row)
+        try:
+            os.makedirs(job.directory, exist_ok=True)
+            result = _handlers[job.kind](job) or {}
+        except Exception as e:
+            print(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            self.failed += 1
+            self._update(job.job_id, {'status': FAILED, 'error': str(e), 'finished_at': time.time()})
+            return
+        result = dict(result)
+        file_path = result.pop('file', None)
+        fields = {
+            'status': DONE,
+            'finished_at': time.time(),
+            'file_path': file_path,
+            'download_name': result.pop('download_name', None) or (os.path.basename(file_path) if file_path else None),
+            'mimetype': result.pop('mimetype', None),
+            'result': json.dumps(result) if result else None
+        }
+        if 'message' in result:
+            fields['message'] = result['message']
+        self.completed += 1
+        self._update(job.job_id, fields)
+
+    def _update(self, job_id: str, fields: Dict[str, Any]):
+        columns = ', '.join(f"{column} = ?" for column in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE job_id = ?", (*fields.values(), job_id))
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _maybe_cleanup(self):
+        if time.monotonic() - self._cleaned_at < CLEANUP_INTERVAL:
+            return
+        self._cleaned_at = time.monotonic()
+        self.cleanup()
+
+    def cleanup(self):
+        """Fail jobs whose process died mid-run and delete expired jobs"""
+        conn = self._connect()
+        for row in conn.execute("SELECT job_id, pid FROM jobs WHERE status = ? AND host = ?",
+                                (RUNNING, HOST)).fetchall():
+            if not _pid_alive(row['pid']):
+                self._update(row['job_id'], {'status': FAILED, 'error': 'Interrupted: the worker process exited',
+                                             'finished_at': time.time()})
+        cutoff = time.time() - JOBS_RETENTION_HOURS * 3600
+        expired = [row['job_id'] for row in conn.execute(
+            "SELECT job_id FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff))]
+        for job_id in expired:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        if expired:
+            with conn:
+                conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in expired])
+
+    def status(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        counts = {row['status']: row['count'] for row in self._connect().execute(
+            "SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+        return {
+            'workers': self.workers if self._pid == os.getpid() else 0,
+            'kinds': sorted(_handlers),
+            'jobs': counts,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+job_runner = JobRunner()
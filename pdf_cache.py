@@ -0,0 +1,162 @@
+"""
+Disk cache of rendered candidate PDFs
+Files are named after the register_id and a hash of the candidate and
+checklist content, so a changed candidate can never be served an old PDF,
+even by a worker that missed the change. Writes through db.py remove the
+candidate's files right away (see db.add_change_listener); the directory is
+kept under PDF_CACHE_MAX_BYTES by evicting the least recently served files.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Callable, Dict, Optional, Any
+
+PDF_CACHE_ENABLED = os.getenv('PDF_CACHE_ENABLED', 'true').lower() == 'true'
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', os.path.join('data', 'pdf_cache'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_MB', 256)) * 1024 * 1024
+
+# Bump when the report layout changes so existing files stop matching
+RENDER_VERSION = '1'
+
+def _safe_name(register_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', register_id)
+
+def _plain(row):
+    return row.to_dict() if hasattr(row, 'to_dict') else dict(row)
+
+def content_key(register_id: str, candidate: Dict, checklist: Optional[Dict]) -> str:
+    """Cache key: register_id plus a hash of everything the PDF shows"""
+    content = json.dumps({
+        'version': RENDER_VERSION,
+        'candidate': _plain(candidate),
+        'checklist': _plain(checklist) if checklist else None
+    }, sort_keys=True, default=str)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:24]
+    return f"{_safe_name(register_id)}--{digest}"
+
+class PdfCache:
+    """Size-bounded directory of PDFs, least recently served evicted first"""
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.pdf')
+
+    def lookup(self, register_id: str, candidate: Dict, checklist: Optional[Dict]) -> Optional[str]:
+        """Path of the cached PDF for this content, or None"""
+        path = self._path(content_key(register_id, candidate, checklist))
+        try:
+            # Served files count as recently used for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def store(self, register_id: str, candidate: Dict, checklist: Optional[Dict], data: bytes) -> str:
+        """Save a rendered PDF and return its path"""
+        path = self._path(content_key(register_id, candidate, checklist))
+        os.makedirs(self.directory, exist_ok=True)
+        # Write under a temporary name so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._evict()
+        return path
+
+    def get_or_render(self, register_id: str, candidate: Dict, checklist: Optional[Dict],
+                      render: Callable[[], bytes]) -> str:
+        """Path of the cached PDF, rendering and storing it on a miss"""
+        path = self.lookup(register_id, candidate, checklist)
+        if path is not None:
+            return path
+        return self.store(register_id, candidate, checklist, render())
+
+    def invalidate(self, register_id: str):
+        """Remove every cached PDF of a candidate"""
+        prefix = _safe_name(register_id) + '--'
+        for entry in self._entries():
+            if entry.name.startswith(prefix):
+                self._remove(entry.path)
+
+    def on_change(self, table: str, register_id: str):
+        """db change listener"""
+        self.invalidate(register_id)
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.name.endswith('.pdf')]
+        except FileNotFoundError:
+            return []
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another worker
+
+    def _evict(self):
+        """Drop least recently served files until the directory fits max_bytes"""
+        with self._lock:
+            files = []
+            total = 0
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                self.evictions += 1
+
+    def status(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        entries = self._entries()
+        size = 0
+        for entry in entries:
+            try:
+                size += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return {
+            'enabled': PDF_CACHE_ENABLED,
+            'files': len(entries),
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+pdf_cache = PdfCache()
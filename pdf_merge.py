@@ -0,0 +1,119 @@
+"""
+Concatenation of PDF files into one, written as it goes
+pypdf's PdfWriter keeps every merged page in memory until it writes the
+result; PdfConcatenator instead copies the pages of each input (and the
+fonts, images and content streams they use) to the output as soon as the
+input is appended, renumbering its objects. What stays in memory is one
+input at a time plus an offset per written object and a number per page;
+the page tree, catalog and cross-reference table are written by finish().
+
+Only pages and what they reference are carried over: document outlines,
+forms and named destinations of the inputs are dropped (the all-candidates
+report parts have none).
+"""
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import DictionaryObject, IndirectObject, NameObject
+
+# Object numbers of the catalog and page tree, which are written last
+_CATALOG = 1
+_PAGES = 2
+_HEADER = '%PDF-1.4'
+
+class PdfConcatenator:
+    """Append PDF files to the binary file `output`, then call finish() once"""
+
+    def __init__(self, output):
+        self.output = output
+        self.start = output.tell()
+        # Offsets of objects _PAGES + 1, _PAGES + 2, ... relative to `start`
+        self.offsets: List[int] = []
+        self.pages: List[int] = []
+        self.info: Optional[int] = None
+
+    def _tell(self) -> int:
+        return self.output.tell() - self.start
+
+    def _write_header(self, header: str):
+        if self._tell() == 0:
+            # The binary comment marks the file as binary for transfer tools
+            self.output.write(header.encode('ascii') + b'\n%\xe2\xe3\xcf\xd3\n')
+
+    def append(self, path: str):
+        """Copy the pages of the PDF file at `path` to the output"""
+        reader = PdfReader(path)
+        self._write_header(reader.pdf_header)
+
+        # Pages come from reader.pages, which carries inherited attributes;
+        # their /Parent (the input's page tree) is not followed
+        objects: Dict[Tuple[int, int], DictionaryObject] = {}
+        for page in reader.pages:
+            reference = page.indirect_reference
+            objects[(reference.idnum, reference.generation)] = page
+        page_keys = list(objects)
+        pending = list(objects.values())
+        info_key = None
+        reference = dict.get(reader.trailer, '/Info')
+        if self.info is None and isinstance(reference, IndirectObject):
+            info_key = (reference.idnum, reference.generation)
+            if info_key not in objects:
+                objects[info_key] = reference.get_object()
+                pending.append(objects[info_key])
+
+        # Everything reachable; dict/list methods are used directly because
+        # pypdf's own accessors would resolve the references to renumber
+        references = {}
+        while pending:
+            obj = pending.pop()
+            if isinstance(obj, DictionaryObject):
+                is_page = dict.get(obj, '/Type') == '/Page'
+                children = [value for name, value in dict.items(obj) if not (is_page and name == '/Parent')]
+            elif isinstance(obj, list):
+                children = list(list.__iter__(obj))
+            else:
+                continue
+            for child in children:
+                if not isinstance(child, IndirectObject):
+                    pending.append(child)
+                    continue
+                # Inherited attributes share one reference object between pages
+                references[id(child)] = child
+                key = (child.idnum, child.generation)
+                if key not in objects:
+                    objects[key] = child.get_object()
+                    pending.append(objects[key])
+
+        numbers = {key: _PAGES + 1 + len(self.offsets) + i for i, key in enumerate(objects)}
+        for reference in references.values():
+            reference.idnum = numbers[(reference.idnum, reference.generation)]
+            reference.generation = 0
+        for key in page_keys:
+            objects[key][NameObject('/Parent')] = IndirectObject(_PAGES, 0, None)
+        for key, obj in objects.items():
+            self.offsets.append(self._tell())
+            self.output.write(f'{numbers[key]} 0 obj\n'.encode('ascii'))
+            obj.write_to_stream(self.output)
+            self.output.write(b'\nendobj\n')
+        self.pages.extend(numbers[key] for key in page_keys)
+        if info_key is not None:
+            self.info = numbers[info_key]
+
+    def finish(self):
+        """Write the page tree, catalog, cross-reference table and trailer"""
+        self._write_header(_HEADER)
+        offsets = dict(enumerate(self.offsets, start=_PAGES + 1))
+        kids = ' '.join(f'{number} 0 R' for number in self.pages)
+        for number, body in ((_PAGES, f'<< /Type /Pages /Count {len(self.pages)} /Kids [ {kids} ] >>'),
+                             (_CATALOG, f'<< /Type /Catalog /Pages {_PAGES} 0 R >>')):
+            offsets[number] = self._tell()
+            self.output.write(f'{number} 0 obj\n{body}\nendobj\n'.encode('ascii'))
+
+        xref = self._tell()
+        size = len(offsets) + 1
+        self.output.write(f'xref\n0 {size}\n0000000000 65535 f \n'.encode('ascii'))
+        for number in range(1, size):
+            self.output.write(f'{offsets[number]:010d} 00000 n \n'.encode('ascii'))
+        info = f' /Info {self.info} 0 R' if self.info is not None else ''
+        self.output.write(f'trailer\n<< /Size {size} /Root {_CATALOG} 0 R{info} >>\n'
+                          f'startxref\n{xref}\n%%EOF\n'.encode('ascii'))
@@ -0,0 +1,388 @@
+"""
+PDF reports of candidate checklists
+Rendering lives outside app.py so the process pool of the all-candidates
+export can import it without starting the web app. The all-candidates report
+is rendered in chunks of PDF_RENDER_CHUNK candidates by up to
+PDF_RENDER_PROCESSES worker processes and concatenated in order (pdf_merge);
+the ZIP export renders single-candidate reports in the same processes.
+"""
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
+from pdf_resources import get_styles as get_pdf_styles, logo_flowable, draw_watermark
+
+# Candidates per separately rendered part of the all-candidates report
+PDF_RENDER_CHUNK = int(os.getenv('PDF_RENDER_CHUNK', 50))
+# Worker processes per web worker for the all-candidates report (1 renders inline)
+PDF_RENDER_PROCESSES = int(os.getenv('PDF_RENDER_PROCESSES', min(os.cpu_count() or 1, 4)))
+
+def render_candidate_pdf(candidate, checklist) -> bytes:
+    """Render the checklist report of one candidate"""
+    # Create PDF with watermark
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, 
+                            rightMargin=0.5*inch, leftMargin=0.5*inch,
+                            topMargin=0.5*inch, bottomMargin=0.5*inch)
+    story = []
+    
+    # Styles and images are shared by all requests (pdf_resources.py)
+    pdf_styles = get_pdf_styles()
+    styles = pdf_styles['sheet']
+    title_style = pdf_styles['title']
+    
+    # Header with logo
+    logo = logo_flowable()
+    if logo:
+        story.append(logo)
+        story.append(Spacer(1, 0.1*inch))
+    
+    story.append(Paragraph("GDG On Campus", title_style))
+    story.append(Paragraph("Kalasalingam Academy of Research & Education", styles['Heading2']))
+    story.append(Paragraph("Core Recruitment 2026 - Interview Checklist Report", styles['Heading3']))
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Candidate Details
+    story.append(Paragraph("<b>Candidate Details</b>", styles['Heading2']))
+    candidate_data = [
+        ['Register ID:', candidate['register_id']],
+        ['Name:', candidate['candidate_name']],
+        ['Department:', candidate['department']],
+        ['Position Applied:', candidate['position_applied']],
+        ['Day Scholar / Hosteler:', candidate['day_scholar_hosteler']],
+        ['Phone Number:', candidate['phone_number']],
+        ['LinkedIn:', candidate['linkedin_profile']],
+        ['GitHub:', candidate['github_profile']]
+    ]
+    
+    candidate_table = Table(candidate_data, colWidths=[2*inch, 4*inch])
+    candidate_table.setStyle(pdf_styles['details_table'])
+    story.append(candidate_table)
+    story.append(Spacer(1, 0.2*inch))
+    
+    if checklist:
+        # Technical Skills
+        if checklist.get('technical_skills'):
+            story.append(Paragraph("<b>Technical Skills</b>", styles['Heading2']))
+            skills_data = [['Technology', 'Skill Level']]
+            for skill in checklist['technical_skills']:
+                skills_data.append([skill['technology'], skill['skill_level']])
+            
+            skills_table = Table(skills_data, colWidths=[3*inch, 3*inch])
+            skills_table.setStyle(pdf_styles['skills_table'])
+            story.append(skills_table)
+            story.append(Spacer(1, 0.2*inch))
+        
+        # Evaluation
+        story.append(Paragraph("<b>Evaluation</b>", styles['Heading2']))
+        eval_data = [
+            ['Practical Experience:', checklist.get('practical_experience', 'N/A')],
+            ['Communication Skills:', checklist.get('communication_skills', 'N/A')],
+            ['Time Management:', checklist.get('time_management', 'N/A')],
+            ['Leadership Ability:', checklist.get('leadership_ability', 'N/A')]
+        ]
+        
+        eval_table = Table(eval_data, colWidths=[2*inch, 4*inch])
+        eval_table.setStyle(pdf_styles['details_table'])
+        story.append(eval_table)
+        story.append(Spacer(1, 0.2*inch))
+        
+        # Comments
+        if checklist.get('interviewer_comments'):
+            story.append(Paragraph("<b>Interviewer Comments:</b>", styles['Heading3']))
+            story.append(Paragraph(checklist['interviewer_comments'], styles['Normal']))
+            story.append(Spacer(1, 0.1*inch))
+        
+        if checklist.get('faculty_comments'):
+            story.append(Paragraph("<b>Faculty Mentor Comments:</b>", styles['Heading3']))
+            story.append(Paragraph(checklist['faculty_comments'], styles['Normal']))
+            story.append(Spacer(1, 0.1*inch))
+        
+        # Internal
+        story.append(Paragraph("<b>Internal Official Use</b>", styles['Heading2']))
+        internal_data = [
+            ['Interview Taken By:', checklist.get('interview_taken_by', 'N/A')],
+            ['Reviewed By:', checklist.get('reviewed_by', 'N/A')],
+            ['Remarks:', checklist.get('remarks', 'N/A')]
+        ]
+        
+        internal_table = Table(internal_data, colWidths=[2*inch, 4*inch])
+        internal_table.setStyle(pdf_styles['details_table'])
+        story.append(internal_table)
+    
+    # Watermark tiles are drawn once into a form that every page reuses
+    doc.build(story, onFirstPage=draw_watermark, onLaterPages=draw_watermark)
+    return buffer.getvalue()
+
+
+def _summary_header(story: list, styles: Dict):
+    # Header with logo
+    logo = logo_flowable()
+    if logo:
+        story.append(logo)
+        story.append(Spacer(1, 0.1*inch))
+    
+    story.append(Paragraph("GDG On Campus", styles['title']))
+    story.append(Paragraph("Kalasalingam Academy of Research & Education", styles['sheet']['Heading2']))
+    story.append(Paragraph("Core Recruitment 2026 - All Interview Checklist Reports", styles['sheet']['Heading3']))
+    story.append(Spacer(1, 0.3*inch))
+
+def _summary_section(story: list, pdf_styles: Dict, candidate, checklist):
+    styles = pdf_styles['sheet']
+    register_id = candidate['register_id']
+    
+    # Space before each candidate
+    if story:
+        story.append(Spacer(1, 0.2*inch))
+    
+    # Candidate Details
+    story.append(Paragraph(f"<b>Candidate: {candidate['candidate_name']} ({register_id})</b>", styles['Heading2']))
+    candidate_data = [
+        ['Register ID:', candidate['register_id']],
+        ['Name:', candidate['candidate_name']],
+        ['Department:', candidate['department']],
+        ['Position Applied:', candidate['position_applied']]
+    ]
+    
+    candidate_table = Table(candidate_data, colWidths=[2*inch, 4*inch])
+    candidate_table.setStyle(pdf_styles['summary_table'])
+    story.append(candidate_table)
+    story.append(Spacer(1, 0.1*inch))
+    
+    # Technical Skills Summary
+    if checklist.get('technical_skills'):
+        skills_text = ", ".join([f"{s['technology']} ({s['skill_level']})" 
+                                for s in checklist['technical_skills']])
+        story.append(Paragraph(f"<b>Technical Skills:</b> {skills_text}", styles['Normal']))
+    
+    # Evaluation Summary
+    eval_text = f"Communication: {checklist.get('communication_skills', 'N/A')}, "
+    eval_text += f"Time Management: {checklist.get('time_management', 'N/A')}, "
+    eval_text += f"Leadership: {checklist.get('leadership_ability', 'N/A')}"
+    story.append(Paragraph(f"<b>Evaluation:</b> {eval_text}", styles['Normal']))
+    
+    story.append(Spacer(1, 0.1*inch))
+    story.append(Paragraph("─" * 80, styles['Normal']))
+
+def render_summary_pdf(entries: List[Tuple[Dict, Dict]], header: bool = True) -> bytes:
+    """Render (candidate, checklist) pairs as one part of the all-candidates
+    report; only the first part carries the header"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    story = []
+    pdf_styles = get_pdf_styles()
+    if header:
+        _summary_header(story, pdf_styles)
+    for candidate, checklist in entries:
+        _summary_section(story, pdf_styles, candidate, checklist)
+    if not story:
+        story.append(Spacer(1, 0.1*inch))
+    doc.build(story)
+    return buffer.getvalue()
+
+def _render_part(args) -> str:
+    """Process pool entry point: writes the part to a temporary file and
+    returns its path, so rendered parts do not pass through the parent"""
+    entries, header = args
+    fd, path = tempfile.mkstemp(prefix='rms-part-', suffix='.pdf')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(render_summary_pdf(entries, header))
+    return path
+
+def _remove_part(future):
+    """Done callback deleting the file of a part that is no longer merged"""
+    if not future.cancelled() and future.exception() is None:
+        try:
+            os.remove(future.result())
+        except OSError:
+            pass
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """This process's render pool. Workers are started by a fork server, so
+    they never inherit the web worker's threads, sockets or locks."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            try:
+                context = multiprocessing.get_context('forkserver')
+            except ValueError:
+                context = multiprocessing.get_context('spawn')
+            _pool = ProcessPoolExecutor(max_workers=PDF_RENDER_PROCESSES, mp_context=context)
+            _pool_pid = os.getpid()
+        return _pool
+
+def _chunks(entries: Iterable, size: int):
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def render_all_pdf(entries: Iterable[Tuple[Dict, Dict]], output,
+                   progress: Optional[Callable[[int, int], None]] = None):
+    """Write the all-candidates report for (candidate, checklist) pairs to the
+    binary file `output`; `progress(done, total)` is called as parts finish.
+
+    Parts of PDF_RENDER_CHUNK candidates are rendered in parallel to temporary
+    files and copied to `output` in order as each is next (pdf_merge), so
+    memory is bounded by the parts in flight (two per worker process), not by
+    the size of the report. Each part starts on a new page.
+    Without pypdf, or with a single part, the report is rendered inline.
+    """
+    entries = list(entries)
+    try:
+        from pdf_merge import PdfConcatenator
+    except ImportError:
+        PdfConcatenator = None
+    
+    total = len(entries)
+    if PdfConcatenator is None or PDF_RENDER_PROCESSES <= 1 or total <= PDF_RENDER_CHUNK:
+        output.write(render_summary_pdf(entries))
+        if progress:
+            progress(total, total)
+        return
+    
+    pool = _get_pool()
+    concatenator = PdfConcatenator(output)
+    window = PDF_RENDER_PROCESSES * 2
+    pending = []
+    merged = 0
+    
+    def merge(future, size):
+        nonlocal merged
+        path = future.result()
+        try:
+            concatenator.append(path)
+        finally:
+            os.remove(path)
+        merged += size
+        if progress:
+            progress(merged, total)
+    
+    try:
+        for index, chunk in enumerate(_chunks(entries, PDF_RENDER_CHUNK)):
+            # Records pickle as plain rows, see records.Record.__reduce__
+            pending.append((pool.submit(_render_part, (chunk, index == 0)), len(chunk)))
+            if len(pending) >= window:
+                merge(*pending.pop(0))
+        while pending:
+            merge(*pending.pop(0))
+    except BaseException:
+        for future, _ in pending:
+            future.cancel()
+            future.add_done_callback(_remove_part)
+        raise
+    concatenator.finish()
+
+def _render_candidate(args) -> bytes:
+    """Process pool entry point"""
+    candidate, checklist = args
+    return render_candidate_pdf(candidate, checklist)
+
+def iter_candidate_pdfs(entries: Iterable[Tuple[str, Dict, Optional[Dict]]],
+                        cache=None) -> Iterator[Tuple[str, bytes]]:
+    """Yield (key, pdf_bytes) for (key, candidate, checklist) entries as each
+    report is ready, not in input order.
+
+    Reports found in `cache` (a pdf_cache.PdfCache) are yielded first-come;
+    the rest are rendered by the process pool with at most four per process
+    in flight, and stored in the cache. Closing the generator cancels the
+    renders that have not started.
+    """
+    def cached(candidate, checklist):
+        if cache is None:
+            return None
+        path = cache.lookup(candidate['register_id'], candidate, checklist)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None  # Evicted meanwhile
+
+    def finished(candidate, checklist, data):
+        if cache is not None:
+            cache.store(candidate['register_id'], candidate, checklist, data)
+        return data
+
+    if PDF_RENDER_PROCESSES <= 1:
+        for key, candidate, checklist in entries:
+            data = cached(candidate, checklist)
+            if data is None:
+                data = finished(candidate, checklist, render_candidate_pdf(candidate, checklist))
+            yield key, data
+        return
+
+    pool = _get_pool()
+    window = PDF_RENDER_PROCESSES * 4
+    pending = {}
+    try:
+        for key, candidate, checklist in entries:
+            data = cached(candidate, checklist)
+            if data is not None:
+                yield key, data
+                continue
+            future = pool.submit(_render_candidate, (candidate, checklist))
+            pending[future] = (key, candidate, checklist)
+            while len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key, candidate, checklist = pending.pop(future)
+                    yield key, finished(candidate, checklist, future.result())
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, candidate, checklist = pending.pop(future)
+                yield key, finished(candidate, checklist, future.result())
+    finally:
+        for future in pending:
+            future.cancel()
+
+class _ZipChunks:
+    """Write-only file for zipfile that hands out what was written so far.
+    It has no seek(), so zipfile writes sizes after each member (data
+    descriptors) instead of going back to the member header."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_pdf_zip(files: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Yield a ZIP archive of (filename, pdf_bytes) pairs piece by piece, so
+    only the member being added is held in memory. PDFs are compressed
+    already, so members are stored as is."""
+    buffer = _ZipChunks()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for filename, data in files:
+            archive.writestr(filename, data)
+            yield buffer.take()
+    # The central directory is written on close
+    yield buffer.take()
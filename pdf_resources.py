@@ -0,0 +1,157 @@
+"""
+Shared ReportLab resources for the PDF downloads
+Styles are built and images decoded once per process instead of on every
+request. The page watermark is drawn once per document as a form XObject that
+every page references, from a copy of static/Watermark.jpg downscaled to the
+resolution it is printed at.
+"""
+import io
+import os
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, TableStyle
+
+LOGO_PATH = os.path.join('static', 'KARE-ACM-SiGBED.png')
+WATERMARK_PATH = os.path.join('static', 'Watermark.jpg')
+
+# Watermark tile edge and opacity
+WATERMARK_SIZE = 4 * inch
+WATERMARK_ALPHA = 0.15
+# Pixels per inch of the embedded watermark; it is faint, so 150 is plenty
+WATERMARK_DPI = int(os.getenv('PDF_WATERMARK_DPI', 150))
+WATERMARK_JPEG_QUALITY = int(os.getenv('PDF_WATERMARK_QUALITY', 70))
+WATERMARK_FORM = 'Watermark'
+
+class _JpegImage(ImageReader):
+    """Image kept as JPEG bytes, so PDFs embed it as is (DCTDecode) instead
+    of as recompressed pixels; each embedding reads its own stream"""
+
+    def __init__(self, jpeg_bytes: bytes):
+        self._jpeg_bytes = jpeg_bytes
+        super().__init__(io.BytesIO(jpeg_bytes))
+
+    def jpeg_fh(self):
+        return io.BytesIO(self._jpeg_bytes)
+
+@lru_cache(maxsize=None)
+def get_styles() -> Dict[str, Any]:
+    """Paragraph and table styles of the reports. Shared by every request, so
+    callers must not modify them."""
+    sheet = getSampleStyleSheet()
+    return {
+        'sheet': sheet,
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=sheet['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#1a73e8'),
+            spaceAfter=12,
+            alignment=1,  # Center
+            fontName='Helvetica-Bold'
+        ),
+        # Label / value tables of the single candidate report
+        'details_table': TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        'skills_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        # Compact candidate tables of the all-candidates report
+        'summary_table': TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    }
+
+@lru_cache(maxsize=None)
+def _logo_bytes() -> Optional[bytes]:
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with open(LOGO_PATH, 'rb') as f:
+        return f.read()
+
+def logo_flowable() -> Optional[Image]:
+    """A new header logo flowable (flowables hold layout state, so one per
+    document) read from memory; None without a logo file"""
+    data = _logo_bytes()
+    if data is None:
+        return None
+    return Image(io.BytesIO(data), width=1.2*inch, height=1.2*inch)
+
+@lru_cache(maxsize=None)
+def watermark_image() -> Optional[ImageReader]:
+    """The watermark as an in-memory JPEG at WATERMARK_DPI, or None when
+    static/Watermark.jpg is missing or unreadable"""
+    if not os.path.exists(WATERMARK_PATH):
+        return None
+    try:
+        from PIL import Image as PILImage
+        with PILImage.open(WATERMARK_PATH) as image:
+            image = image.convert('RGB')
+            # Fit the tile box like preserveAspectRatio does, at print resolution
+            max_pixels = int(WATERMARK_SIZE / inch * WATERMARK_DPI)
+            image.thumbnail((max_pixels, max_pixels), PILImage.LANCZOS)
+            data = io.BytesIO()
+            image.save(data, format='JPEG', quality=WATERMARK_JPEG_QUALITY, optimize=True)
+        reader = _JpegImage(data.getvalue())
+        # Decode once now; drawImage hashes the pixels to name the XObject
+        reader.getRGBData()
+        return reader
+    except Exception as e:
+        print(f"Watermark unavailable: {e}")
+        return None
+
+def draw_watermark(canv, doc):
+    """Page callback (onFirstPage / onLaterPages) tiling the watermark.
+
+    The tiles are drawn once per document into a form XObject; pages only
+    reference it, so the image data and drawing commands are stored once.
+    """
+    image = watermark_image()
+    if image is None:
+        return
+    if not canv.hasForm(WATERMARK_FORM):
+        page_width = int(doc.width + doc.leftMargin + doc.rightMargin)
+        page_height = int(doc.height + doc.topMargin + doc.bottomMargin)
+        canv.beginForm(WATERMARK_FORM)
+        canv.setFillAlpha(WATERMARK_ALPHA)
+        canv.setStrokeAlpha(WATERMARK_ALPHA)
+        for x in range(0, page_width, int(WATERMARK_SIZE)):
+            for y in range(0, page_height, int(WATERMARK_SIZE)):
+                canv.drawImage(image, x + doc.leftMargin, y + doc.bottomMargin,
+                               width=WATERMARK_SIZE, height=WATERMARK_SIZE,
+                               preserveAspectRatio=True, mask='auto')
+        canv.endForm()
+    canv.saveState()
+    canv.doForm(WATERMARK_FORM)
+    canv.restoreState()
+
+def warm_up():
+    """Build every shared resource now (e.g. before gunicorn forks)"""
+    get_styles()
+    _logo_bytes()
+    watermark_image()
@@ -0,0 +1,186 @@
+"""
+Compact read-only records for candidates, checklists and technical skills
+Rows are stored in __slots__ instead of per-row dicts, and repeated values
+(departments, ratings, skill levels, ...) are interned so every record shares
+one string object. Records behave like read-only dicts (record['name'],
+record.get(), items(), ...) and Jinja reads them as attributes, so templates
+and app code work unchanged. Cached records are shared between requests,
+which is why they cannot be modified: use replace() for a changed copy.
+"""
+import functools
+import json
+import sys
+from collections.abc import Mapping
+from typing import Dict, Tuple, Any
+
+@functools.lru_cache(maxsize=1024)
+def _parse_position_text(value: str) -> Tuple[str, ...]:
+    if value.strip().startswith('['):
+        try:
+            positions = json.loads(value)
+        except json.JSONDecodeError:
+            positions = None
+        if isinstance(positions, list):
+            return tuple(str(p).strip() for p in positions if str(p).strip())
+    return tuple(p.strip() for p in value.split(',') if p.strip())
+
+def parse_positions(value) -> Tuple[str, ...]:
+    """Positions of a position_applied value: a JSON array string (rows from
+    before the positions column), a list, or comma-separated text"""
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(str(p).strip() for p in value if str(p).strip())
+    return _parse_position_text(str(value))
+
+def format_positions(value):
+    """Display form of positions: comma-separated names"""
+    if not value:
+        return value
+    return ', '.join(parse_positions(value))
+
+def normalize_positions(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a candidate row to write: position_applied in display form plus
+    the positions array the database filters on (database_functions.sql)"""
+    if 'position_applied' not in row:
+        return row
+    positions = parse_positions(row['position_applied'])
+    return dict(row, position_applied=', '.join(positions) if positions else row['position_applied'],
+                positions=list(positions))
+
+class Record(Mapping):
+    """Base class: subclasses list their columns in FIELDS and the columns with
+    few distinct values in INTERNED. Columns outside FIELDS (new database
+    columns, view extras) are kept in a small side dict."""
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    INTERNED = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'Record':
+        """Build a record from a PostgREST row (or another record)"""
+        if isinstance(row, cls):
+            return row
+        record = object.__new__(cls)
+        extra = None
+        for key, value in row.items():
+            if key in cls._field_set:
+                if key in cls.INTERNED and type(value) is str:
+                    value = sys.intern(value)
+                object.__setattr__(record, key, cls._convert(key, value))
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(record, '_extra', extra)
+        return record
+
+    @classmethod
+    def _convert(cls, key: str, value):
+        """Hook for nested values"""
+        return value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __setattr__(self, key, value):
+        raise TypeError(f"{type(self).__name__} is read-only, use replace()")
+
+    __setitem__ = __setattr__
+
+    def __delattr__(self, key):
+        raise TypeError(f"{type(self).__name__} is read-only, use replace()")
+
+    def __reduce__(self):
+        # Slots plus a blocked __setattr__ defeat the default pickling
+        return (type(self).from_row, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def replace(self, **changes) -> 'Record':
+        """A copy with some columns changed or added"""
+        row = dict(self.items())
+        row.update(changes)
+        return type(self).from_row(row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy, e.g. for JSON"""
+        return dict(self.items())
+
+
+class Skill(Record):
+    __slots__ = ('technology', 'skill_level')
+    FIELDS = __slots__
+    INTERNED = frozenset(FIELDS)
+
+
+class Candidate(Record):
+    __slots__ = ('register_id', 'candidate_name', 'department', 'position_applied', 'positions',
+                 'day_scholar_hosteler', 'phone_number', 'linkedin_profile', 'github_profile',
+                 'imported_at', 'created_at', 'updated_at', 'has_checklist')
+    FIELDS = __slots__
+    INTERNED = frozenset({'department', 'position_applied', 'day_scholar_hosteler', 'imported_at'})
+
+    @classmethod
+    def _convert(cls, key, value):
+        # Rows written before the positions column hold a JSON array string;
+        # converted once here, so templates and PDFs print the value as it is
+        if key == 'position_applied' and type(value) is str and value.startswith('['):
+            return sys.intern(format_positions(value))
+        if key == 'positions':
+            return tuple(sys.intern(str(p)) for p in value or ())
+        return value
+
+
+class Checklist(Record):
+    __slots__ = ('checklist_id', 'register_id', 'technical_skills', 'practical_experience',
+                 'communication_skills', 'time_management', 'leadership_ability',
+                 'interviewer_comments', 'faculty_comments', 'interview_taken_by', 'reviewed_by',
+                 'remarks', 'created_at', 'updated_at')
+    FIELDS = __slots__
+    INTERNED = frozenset({'practical_experience', 'communication_skills', 'time_management',
+                          'leadership_ability', 'interview_taken_by', 'reviewed_by'})
+
+    @classmethod
+    def _convert(cls, key, value):
+        if key == 'technical_skills':
+            return tuple(Skill.from_row(skill) for skill in value or ())
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = dict(self.items())
+        if 'technical_skills' in row:
+            row['technical_skills'] = [skill.to_dict() for skill in row['technical_skills']]
+        return row
+
+
+def candidate_table(rows: Dict[str, Dict]) -> Dict[str, Candidate]:
+    """Convert {register_id: row} to {register_id: Candidate}"""
+    return {key: Candidate.from_row(row) for key, row in rows.items()}
+
+def checklist_table(rows: Dict[str, Dict]) -> Dict[str, Checklist]:
+    """Convert {register_id: row} to {register_id: Checklist}"""
+    return {key: Checklist.from_row(row) for key, row in rows.items()}
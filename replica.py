@@ -0,0 +1,394 @@
+"""
+Local SQLite read replica of the Supabase tables
+Reads are served from a local file that is kept up to date incrementally
+using each table's updated_at column; writes still go to Supabase (see backends.py)
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any
+
+from supabase_config import get_supabase_client
+from backends import CANDIDATE_SEARCH_COLUMNS
+from records import normalize_positions
+
+# Rows per request when downloading a table (PostgREST caps responses at max-rows)
+FETCH_PAGE_SIZE = 1000
+
+# register_ids per request when downloading skills of changed checklists
+SKILLS_BATCH_SIZE = 100
+
+# Re-read rows changed this long before the watermark, so a transaction that
+# committed late with an older updated_at is not missed
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# Local table -> (Supabase table, key column, extra indexed columns)
+TABLES = {
+    'users': ('users_re26', 'user_id', []),
+    'candidates': ('candidates_re26', 'register_id', ['department']),
+    'checklists': ('checklists_re26', 'register_id', ['faculty_comments']),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candidates (
+    register_id TEXT PRIMARY KEY,
+    department TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_department ON candidates (department, register_id);
+CREATE TABLE IF NOT EXISTS checklists (
+    register_id TEXT PRIMARY KEY,
+    faculty_comments TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS skills (
+    register_id TEXT NOT NULL,
+    technology TEXT,
+    skill_level TEXT
+);
+CREATE INDEX IF NOT EXISTS skills_register_id ON skills (register_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL,
+    reconciled_at REAL
+);
+"""
+
+def _fetch_all(build_query, order_column: str) -> List[Dict]:
+    """Download every row of a query, one page of FETCH_PAGE_SIZE at a time"""
+    rows = []
+    start = 0
+    while True:
+        page = build_query().order(order_column).range(start, start + FETCH_PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < FETCH_PAGE_SIZE:
+            return rows
+        start += FETCH_PAGE_SIZE
+
+# Candidate columns stored in their own column rather than only in data
+_INDEXED_CANDIDATE_COLUMNS = {'register_id', 'department'}
+
+def _candidate_column(column: str) -> str:
+    """SQL expression for a candidate column (alias c)"""
+    if column in _INDEXED_CANDIDATE_COLUMNS:
+        return f'c.{column}'
+    return f"json_extract(c.data, '$.{column}')"
+
+def _contains_pattern(text: str) -> str:
+    """LIKE pattern (escape character \\) matching `text` anywhere"""
+    return '%' + re.sub(r'([%_\\])', r'\\\1', text) + '%'
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a PostgREST timestamp such as 2026-01-15T10:00:00.123+00:00"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+class Replica:
+    """SQLite copy of users, candidates, checklists and technical skills.
+
+    One file can be shared by every worker on the host; each process opens its
+    own connections and any of them may sync it.
+    """
+
+    def __init__(self, path: str, sync_interval: float = 15, reconcile_interval: float = 300):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self.last_error = None
+        self.last_sync = None
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._thread_pid = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection (connections must not cross fork or threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ------------------------------------------------------------------
+    # Synchronisation
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the background sync thread of this process (once per pid)"""
+        if self._thread_pid == os.getpid():
+            return
+        self._thread_pid = os.getpid()
+        thread = threading.Thread(target=self._sync_loop, daemon=True, name='db-replica-sync')
+        thread.start()
+
+    def _sync_loop(self):
+        """Sync forever; failures are recorded and reads keep using local data"""
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"[Replica] Sync failed: {e}")
+
+    def ensure_synced(self):
+        """Block on a first full sync if this replica file has never been filled"""
+        row = self._connect().execute('SELECT COUNT(*) FROM sync_state').fetchone()
+        if row[0] < len(TABLES):
+            self.sync()
+
+    def sync(self, tables: Optional[List[str]] = None):
+        """Pull rows changed since the last sync for the given tables (default all)"""
+        with self._sync_lock:
+            try:
+                supabase = get_supabase_client()
+                for name in tables or TABLES:
+                    self._sync_table(supabase, name)
+                self.last_sync = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+    def _sync_table(self, supabase, name: str):
+        """Incrementally sync one table; tables without updated_at are copied in full"""
+        remote, key, _ = TABLES[name]
+        conn = self._connect()
+        state = conn.execute('SELECT watermark, reconciled_at FROM sync_state WHERE table_name = ?',
+                             (name,)).fetchone()
+        watermark = state['watermark'] if state else None
+
+        if watermark:
+            since = (_parse_timestamp(watermark) - SYNC_OVERLAP).isoformat()
+            rows = _fetch_all(lambda: supabase.table(remote).select('*').gte('updated_at', since), key)
+        else:
+            rows = _fetch_all(lambda: supabase.table(remote).select('*'), key)
+        full = not watermark
+
+        skills = None
+        if name == 'checklists':
+            changed_ids = [row['register_id'] for row in rows]
+            if full:
+                skills = _fetch_all(lambda: supabase.table('technical_skills_re26')
+                                    .select('register_id,technology,skill_level'), 'register_id')
+            else:
+                skills = []
+                for start in range(0, len(changed_ids), SKILLS_BATCH_SIZE):
+                    batch = changed_ids[start:start + SKILLS_BATCH_SIZE]
+                    skills.extend(supabase.table('technical_skills_re26')
+                                  .select('register_id,technology,skill_level')
+                                  .in_('register_id', batch).execute().data)
+
+        # Deleted rows are invisible to an updated_at sync, so compare keys now and then
+        remote_keys = None
+        now = time.time()
+        reconciled_at = state['reconciled_at'] if state else None
+        if not full and (reconciled_at is None or now - reconciled_at >= self.reconcile_interval):
+            remote_keys = {row[key] for row in _fetch_all(lambda: supabase.table(remote).select(key), key)}
+            reconciled_at = now
+
+        timestamps = [row['updated_at'] for row in rows if row.get('updated_at')]
+        new_watermark = watermark
+        if timestamps:
+            newest = max(timestamps, key=_parse_timestamp)
+            if not watermark or _parse_timestamp(newest) > _parse_timestamp(watermark):
+                new_watermark = newest
+
+        with conn:
+            if full:
+                conn.execute(f'DELETE FROM {name}')
+                if name == 'checklists':
+                    conn.execute('DELETE FROM skills')
+                reconciled_at = now
+            self._upsert_rows(conn, name, rows)
+            if skills is not None:
+                if not full:
+                    conn.executemany('DELETE FROM skills WHERE register_id = ?',
+                                     [(row['register_id'],) for row in rows])
+                conn.executemany('INSERT INTO skills (register_id, technology, skill_level) VALUES (?, ?, ?)',
+                                 [(s['register_id'], s['technology'], s['skill_level']) for s in skills])
+            if remote_keys is not None:
+                local_keys = {r[0] for r in conn.execute(f'SELECT {key} FROM {name}')}
+                gone = [(k,) for k in local_keys - remote_keys]
+                conn.executemany(f'DELETE FROM {name} WHERE {key} = ?', gone)
+                if name == 'checklists':
+                    conn.executemany('DELETE FROM skills WHERE register_id = ?', gone)
+            # Without an updated_at column the table is copied in full every time
+            conn.execute('INSERT OR REPLACE INTO sync_state (table_name, watermark, synced_at, reconciled_at) '
+                         'VALUES (?, ?, ?, ?)', (name, new_watermark, now, reconciled_at))
+
+    def _upsert_rows(self, conn: sqlite3.Connection, name: str, rows: List[Dict]):
+        """Store rows as JSON next to their key and indexed columns"""
+        _, key, extra = TABLES[name]
+        if name == 'candidates':
+            # Rows not yet migrated by database_functions.sql are normalized here
+            rows = [row if row.get('positions') else normalize_positions(row) for row in rows]
+        columns = [key] + extra + ['data']
+        placeholders = ', '.join('?' for _ in columns)
+        conn.executemany(
+            f'INSERT OR REPLACE INTO {name} ({", ".join(columns)}) VALUES ({placeholders})',
+            [tuple(row.get(c) for c in [key] + extra) + (json.dumps(row),) for row in rows]
+        )
+
+    def delete(self, name: str, key_value: str):
+        """Drop a row locally right after it was deleted in Supabase"""
+        _, key, _ = TABLES[name]
+        with self._connect() as conn:
+            conn.execute(f'DELETE FROM {name} WHERE {key} = ?', (key_value,))
+
+    def status(self) -> Dict[str, Any]:
+        """Sync state for monitoring"""
+        conn = self._connect()
+        return {
+            'path': self.path,
+            'last_sync': self.last_sync,
+            'last_error': self.last_error,
+            'tables': {
+                row['table_name']: {'watermark': row['watermark'], 'synced_at': row['synced_at']}
+                for row in conn.execute('SELECT * FROM sync_state')
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Reads (same return shapes as backends.StorageBackend)
+    # ------------------------------------------------------------------
+
+    def _rows(self, sql: str, params=()) -> List[Dict]:
+        return [json.loads(row['data']) for row in self._connect().execute(sql, params)]
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        rows = self._rows('SELECT data FROM users WHERE user_id = ?', (user_id,))
+        return rows[0] if rows else None
+
+    def get_all_users(self) -> Dict[str, Dict]:
+        return {row['user_id']: row for row in self._rows('SELECT data FROM users')}
+
+    def get_candidate(self, register_id: str) -> Optional[Dict]:
+        rows = self._rows('SELECT data FROM candidates WHERE register_id = ?', (register_id,))
+        return rows[0] if rows else None
+
+    def get_all_candidates(self) -> Dict[str, Dict]:
+        return {row['register_id']: row for row in self._rows('SELECT data FROM candidates')}
+
+    def get_candidate_ids(self) -> set:
+        return {row[0] for row in self._connect().execute('SELECT register_id FROM candidates')}
+
+    def get_candidate_departments(self) -> List[str]:
+        return [row[0] for row in self._connect().execute(
+            "SELECT DISTINCT department FROM candidates WHERE department IS NOT NULL AND department != '' "
+            "ORDER BY department")]
+
+    def fetch_candidates_page(self, after: Optional[tuple], before: Optional[tuple], limit: int,
+                              department: Optional[str], status: Optional[str],
+                              columns: List[str], search: Optional[str] = None,
+                              position: Optional[str] = None, sort: str = 'register_id',
+                              descending: bool = False) -> List[Dict]:
+        """Keyset page of candidates, see StorageBackend.fetch_candidates_page"""
+        conditions, params = [], []
+        if department:
+            conditions.append('c.department = ?')
+            params.append(department)
+        if status == 'completed':
+            conditions.append('k.register_id IS NOT NULL')
+        elif status == 'pending':
+            conditions.append('k.register_id IS NULL')
+        # LIKE is case-insensitive for ASCII in SQLite
+        if search:
+            pattern = _contains_pattern(search)
+            conditions.append('(' + ' OR '.join(f"{_candidate_column(column)} LIKE ? ESCAPE '\\'"
+                                                for column in CANDIDATE_SEARCH_COLUMNS) + ')')
+            params.extend([pattern] * len(CANDIDATE_SEARCH_COLUMNS))
+        if position:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(c.data, '$.positions') p WHERE p.value = ?)")
+            params.append(position)
+
+        backwards = before is not None and after is None
+        key = before if backwards else after
+        reverse = descending != backwards
+        op = '<' if reverse else '>'
+        if sort == 'register_id':
+            order_by = ['c.register_id']
+            if key is not None:
+                conditions.append(f'c.register_id {op} ?')
+                params.append(key[1])
+        else:
+            # NULLs sort after every value, as in PostgreSQL
+            column = _candidate_column(sort)
+            order_by = [f'{column} IS NULL', f"COALESCE({column}, '')", 'c.register_id']
+            if key is not None:
+                conditions.append(f"({', '.join(order_by)}) {op} (?, ?, ?)")
+                params.extend([key[0] is None, key[0] or '', key[1]])
+
+        where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+        direction = ' DESC' if reverse else ' ASC'
+        order_by = ', '.join(part + direction for part in order_by)
+        result = self._connect().execute(
+            f'SELECT c.data, k.register_id IS NOT NULL AS has_checklist '
+            f'FROM candidates c LEFT JOIN checklists k ON k.register_id = c.register_id '
+            f'{where} ORDER BY {order_by} LIMIT ?', params + [limit])
+
+        rows = []
+        for row in result:
+            data = json.loads(row['data'])
+            if columns != ['*']:
+                data = {c: data.get(c) for c in columns}
+            data['has_checklist'] = bool(row['has_checklist'])
+            rows.append(data)
+        return rows
+
+    def get_checklists(self, register_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Checklists with nested technical_skills; all of them when register_ids is None"""
+        conn = self._connect()
+        if register_ids is None:
+            checklist_rows = conn.execute('SELECT register_id, data FROM checklists').fetchall()
+            skill_rows = conn.execute('SELECT * FROM skills ORDER BY rowid').fetchall()
+        else:
+            register_ids = list(register_ids)
+            checklist_rows, skill_rows = [], []
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(register_ids), 500):
+                batch = register_ids[start:start + 500]
+                marks = ', '.join('?' for _ in batch)
+                checklist_rows += conn.execute(
+                    f'SELECT register_id, data FROM checklists WHERE register_id IN ({marks})', batch).fetchall()
+                skill_rows += conn.execute(
+                    f'SELECT * FROM skills WHERE register_id IN ({marks}) ORDER BY rowid', batch).fetchall()
+
+        skills_by_register = {}
+        for skill in skill_rows:
+            skills_by_register.setdefault(skill['register_id'], []).append({
+                'technology': skill['technology'],
+                'skill_level': skill['skill_level']
+            })
+        checklists = {}
+        for row in checklist_rows:
+            checklist = json.loads(row['data'])
+            checklist['technical_skills'] = skills_by_register.get(row['register_id'], [])
+            checklists[row['register_id']] = checklist
+        return checklists
+
+    def get_dashboard_counts(self) -> Dict[str, int]:
+        """Counts behind db.get_dashboard_stats"""
+        conn = self._connect()
+        return {
+            'candidates': conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0],
+            'checklists': conn.execute('SELECT COUNT(*) FROM checklists').fetchone()[0],
+            'faculty_reviewed': conn.execute(
+                "SELECT COUNT(*) FROM checklists WHERE faculty_comments IS NOT NULL AND faculty_comments != ''"
+            ).fetchone()[0]
+        }
@@ -0,0 +1,183 @@
+"""
+Failure handling for calls to Supabase
+Retries with jittered exponential backoff for idempotent reads, and a circuit
+breaker that fails fast while the database keeps failing, so slow or down
+Supabase does not pin every gunicorn worker until it is killed. Within a
+request the retry budget is shared by all of its calls (start_request_budget),
+so a route making several reads still answers before the worker timeout.
+"""
+import contextvars
+import random
+import threading
+import time
+from typing import Dict, Any
+
+# PostgREST codes for a database that is unreachable or too slow:
+# PGRST000-003 connection / pool errors, 57014 statement timeout
+TRANSIENT_ERROR_CODES = {'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003', '57014'}
+
+# Monotonic time after which no retry starts, for every call of the current
+# request; None outside requests, where each call has its own budget
+_request_deadline = contextvars.ContextVar('request_deadline', default=None)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the database while the breaker is open"""
+
+def is_transient_error(error: Exception) -> bool:
+    """True for failures worth retrying and counting against the breaker:
+    network errors, timeouts, 5xx / 429 responses. Errors caused by the request
+    itself (missing column, constraint violation, ...) are not transient."""
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    if code in TRANSIENT_ERROR_CODES:
+        return True
+    # Non-JSON error responses carry the HTTP status as their code
+    try:
+        status = int(code)
+    except (TypeError, ValueError):
+        return False
+    return status == 429 or 500 <= status < 600
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive transient failures;
+    open rejects calls for `reset_timeout` seconds, then half open lets a
+    single trial call through which closes or re-opens the circuit."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+        self.last_error = None
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not be attempted"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.total_rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit is open, failing fast")
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    self.total_rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit is half open, trial call in progress")
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"{self.name} circuit closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_running = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and 0 < self.failure_threshold <= self.consecutive_failures):
+                print(f"{self.name} circuit opened after {self.consecutive_failures} failures: {self.last_error}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+
+    def record_ignored(self):
+        """The call failed for a non-transient reason; the backend answered, so
+        a half-open trial counts as healthy"""
+        self.record_success()
+
+    def status(self) -> Dict[str, Any]:
+        """Breaker state for monitoring"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(self.reset_timeout - (time.monotonic() - self.opened_at), 0), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'retry_in': retry_in,
+                'times_opened': self.times_opened,
+                'total_failures': self.total_failures,
+                'total_rejected': self.total_rejected,
+                'last_error': self.last_error
+            }
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter") bounded by a time budget"""
+
+    def __init__(self, retries: int = 2, base_delay: float = 0.2, max_delay: float = 2.0,
+                 budget: float = 20.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+def start_request_budget(budget: float) -> contextvars.Token:
+    """Start a retry budget of `budget` seconds shared by all calls made in
+    this context (and in contexts copied from it); returns the token for
+    end_request_budget"""
+    return _request_deadline.set(time.monotonic() + budget)
+
+def end_request_budget(token: contextvars.Token):
+    _request_deadline.reset(token)
+
+def guarded_call(call, breaker: CircuitBreaker, retry: RetryPolicy = None):
+    """Run `call` through the breaker; with a retry policy (idempotent calls
+    only) transient failures are retried while the budget allows: the call's
+    own, or what is left of the request's when that runs out first"""
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = call()
+        except Exception as e:
+            if not is_transient_error(e):
+                breaker.record_ignored()
+                raise
+            breaker.record_failure(e)
+            attempt += 1
+            if retry is None or attempt > retry.retries:
+                raise
+            delay = retry.delay(attempt)
+            deadline = started + retry.budget
+            request_deadline = _request_deadline.get()
+            if request_deadline is not None:
+                deadline = min(deadline, request_deadline)
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,347 @@
+"""
+In-memory search index over candidates and their technical skills
+Each worker keeps an inverted index of the words in register_id, candidate
+name, department, positions and skills. A query word matches indexed words
+that start with it, and, for typos and partial words, words sharing enough
+trigrams with it. Writes of this process (db.add_change_listener) are applied
+to the index before the next query; writes of other workers show up after the
+periodic background rebuild (SEARCH_INDEX_MAX_AGE).
+"""
+import bisect
+import functools
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+
+from db import get_all_candidates, get_all_checklists, get_candidate, get_checklist
+
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+# Seconds before the index is rebuilt in the background from the full tables
+SEARCH_INDEX_MAX_AGE = float(os.getenv('SEARCH_INDEX_MAX_AGE', 300))
+
+# Searchable fields and how much a match in each counts
+FIELD_WEIGHTS = {
+    'register_id': 1.0,
+    'name': 1.0,
+    'skill': 0.9,
+    'position': 0.6,
+    'department': 0.6,
+}
+# Query prefixes restricting a word to one field, e.g. "skill:python"
+FIELD_ALIASES = {
+    'id': 'register_id', 'register_id': 'register_id',
+    'name': 'name',
+    'skill': 'skill', 'tech': 'skill',
+    'position': 'position', 'pos': 'position',
+    'dept': 'department', 'department': 'department',
+}
+
+# Scores of a word match, before the field weight
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+# Trigram matches score similarity * TRIGRAM_SCORE, from MIN_SIMILARITY up
+TRIGRAM_SCORE = 0.7
+MIN_SIMILARITY = 0.3
+# More pending changes than this are applied by a full rebuild
+MAX_INCREMENTAL = 200
+
+_WORD = re.compile(r'[a-z0-9+#.]+')
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize_cached(text: str) -> Tuple[str, ...]:
+    return tuple(word.strip('.') for word in _WORD.findall(text.lower()) if word.strip('.'))
+
+def tokenize(text: Optional[str]) -> Tuple[str, ...]:
+    """Lower-case words; keeps + # . inside words (c++, c#, node.js). Repeated
+    values (departments, positions, skills) are split once."""
+    if not text:
+        return ()
+    return _tokenize_cached(str(text))
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrams of a word padded like pg_trgm: two spaces before, one after"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _document(candidate, checklist) -> Dict[str, Any]:
+    """Searchable words and display fields of one candidate"""
+    skills = []
+    if checklist is not None:
+        skills = [skill['technology'] for skill in checklist.get('technical_skills') or ()
+                  if skill.get('technology')]
+    position = candidate.get('position_applied') or ''
+    words = {
+        'register_id': tokenize(candidate.get('register_id')) + (str(candidate['register_id']).lower(),),
+        'name': tokenize(candidate.get('candidate_name')),
+        'department': tokenize(candidate.get('department')),
+        'position': tokenize(position),
+        'skill': [word for skill in skills for word in tokenize(skill)],
+    }
+    return {
+        'words': {(field, word) for field, field_words in words.items() for word in field_words},
+        'summary': {
+            'register_id': candidate['register_id'],
+            'candidate_name': candidate.get('candidate_name'),
+            'department': candidate.get('department'),
+            'position_display': position,
+            'skills': skills,
+            'has_checklist': checklist is not None
+        }
+    }
+
+class _Index:
+    """The index structures; not thread-safe, CandidateIndex locks around it"""
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        # (field, word) -> register_ids
+        self.postings: Dict[Tuple[str, str], Set[str]] = {}
+        # word -> number of postings lists it has, across fields
+        self.word_fields: Counter = Counter()
+        self.sorted_words: List[str] = []
+        self.trigram_words: Dict[str, Set[str]] = {}
+        # word -> its number of trigrams, for similarity
+        self.trigram_counts: Dict[str, int] = {}
+
+    def add(self, register_id: str, document: Dict[str, Any]):
+        self.remove(register_id)
+        self.documents[register_id] = document
+        for key in document['words']:
+            ids = self.postings.get(key)
+            if ids is None:
+                ids = self.postings[key] = set()
+                self._add_word(key[1])
+            ids.add(register_id)
+
+    def remove(self, register_id: str):
+        document = self.documents.pop(register_id, None)
+        if document is None:
+            return
+        for key in document['words']:
+            ids = self.postings[key]
+            ids.discard(register_id)
+            if not ids:
+                del self.postings[key]
+                self._remove_word(key[1])
+
+    def _add_word(self, word: str):
+        self.word_fields[word] += 1
+        if self.word_fields[word] > 1:
+            return
+        bisect.insort(self.sorted_words, word)
+        word_trigrams = trigrams(word)
+        self.trigram_counts[word] = len(word_trigrams)
+        for trigram in word_trigrams:
+            self.trigram_words.setdefault(trigram, set()).add(word)
+
+    def _remove_word(self, word: str):
+        self.word_fields[word] -= 1
+        if self.word_fields[word] > 0:
+            return
+        del self.word_fields[word]
+        del self.sorted_words[bisect.bisect_left(self.sorted_words, word)]
+        del self.trigram_counts[word]
+        for trigram in trigrams(word):
+            words = self.trigram_words[trigram]
+            words.discard(word)
+            if not words:
+                del self.trigram_words[trigram]
+
+    def matching_words(self, term: str) -> Dict[str, float]:
+        """Indexed words matching a query word, with their match score.
+
+        Words starting with the term always match. Unless the term is itself
+        an indexed word, words containing it or sharing enough trigrams with
+        it (typos) match too; numbers only match by prefix or as a part, as
+        similar register_ids are different candidates.
+        """
+        matches = {}
+        words = self.sorted_words
+        for i in range(bisect.bisect_left(words, term), len(words)):
+            word = words[i]
+            if not word.startswith(term):
+                break
+            matches[word] = EXACT_SCORE if word == term else PREFIX_SCORE
+        if len(term) < 3 or term in self.word_fields:
+            return matches
+        query_trigrams = trigrams(term)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigram_words.get(trigram, ()))
+        numeric = term.isdigit()
+        for word, count in shared.items():
+            if word in matches:
+                continue
+            if numeric:
+                similarity = 0.0
+            else:
+                similarity = count / (len(query_trigrams) + self.trigram_counts[word] - count)
+            # A query word inside a longer word ("script" in "javascript")
+            if term in word:
+                similarity = max(similarity, len(term) / len(word))
+            if similarity >= MIN_SIMILARITY:
+                matches[word] = similarity * TRIGRAM_SCORE
+        return matches
+
+    def search(self, terms: Iterable[Tuple[Optional[str], str]]) -> Dict[str, float]:
+        """register_id -> score for documents matching every (field, word) term"""
+        scores = None
+        for field, term in terms:
+            fields = [field] if field else list(FIELD_WEIGHTS)
+            term_scores: Dict[str, float] = {}
+            for word, word_score in self.matching_words(term).items():
+                for name in fields:
+                    ids = self.postings.get((name, word))
+                    if not ids:
+                        continue
+                    score = word_score * FIELD_WEIGHTS[name]
+                    for register_id in ids:
+                        if score > term_scores.get(register_id, 0):
+                            term_scores[register_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {register_id: score + term_scores[register_id]
+                          for register_id, score in scores.items() if register_id in term_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+def parse_query(query: str) -> List[Tuple[Optional[str], str]]:
+    """(field or None, word) terms of a query such as 'jane skill:python'"""
+    terms = []
+    for part in (query or '').split():
+        field = None
+        if ':' in part:
+            prefix, rest = part.split(':', 1)
+            if prefix.lower() in FIELD_ALIASES:
+                field, part = FIELD_ALIASES[prefix.lower()], rest
+        terms.extend((field, word) for word in tokenize(part))
+    return terms
+
+class CandidateIndex:
+    """The per-process index, built on first use and kept current"""
+
+    def __init__(self, max_age: float = SEARCH_INDEX_MAX_AGE):
+        self.max_age = max_age
+        self._index: Optional[_Index] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._pending: Dict[str, Set[str]] = {}
+        self._rebuilding = False
+        self.builds = 0
+        self.updates = 0
+        self.queries = 0
+        self.last_build_seconds = None
+
+    def on_change(self, table: str, register_id: str):
+        """db change listener: refresh the candidate before the next query"""
+        with self._lock:
+            self._pending.setdefault(register_id, set()).add(table)
+
+    def _build(self) -> _Index:
+        started = time.perf_counter()
+        checklists, candidates = get_all_checklists(), get_all_candidates()
+        index = _Index()
+        for register_id, candidate in candidates.items():
+            index.add(register_id, _document(candidate, checklists.get(register_id)))
+        self.builds += 1
+        self.last_build_seconds = round(time.perf_counter() - started, 3)
+        return index
+
+    def _rebuild(self):
+        with self._build_lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self):
+        """Replace the index by a fresh build; changes noted meanwhile stay
+        pending and are applied to the new index"""
+        with self._lock:
+            self._pending.clear()
+        index = self._build()
+        with self._lock:
+            self._index = index
+            self._built_at = time.monotonic()
+            self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self._rebuild()
+            except Exception as e:
+                print(f"Search index rebuild failed: {e}")
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, daemon=True, name='search-index').start()
+
+    def _apply_pending(self):
+        with self._lock:
+            if self._rebuilding:
+                return  # Applied to the index being built once it is in place
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        if len(pending) > MAX_INCREMENTAL:
+            # e.g. a CSV import; one rebuild is cheaper than many single reads
+            self._rebuild()
+            return
+        for register_id in pending:
+            candidate = get_candidate(register_id)
+            if candidate is None:
+                continue  # Read failed; the next rebuild picks it up
+            document = _document(candidate, get_checklist(register_id))
+            with self._lock:
+                self._index.add(register_id, document)
+            self.updates += 1
+
+    def _current(self) -> _Index:
+        if self._index is None:
+            with self._build_lock:
+                if self._index is None:
+                    self._rebuild_locked()
+        else:
+            self._apply_pending()
+            if time.monotonic() - self._built_at > self.max_age:
+                self._rebuild_in_background()
+        return self._index
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matches first: candidate summaries with a 'score'"""
+        terms = parse_query(query)
+        if not terms:
+            return []
+        index = self._current()
+        self.queries += 1
+        with self._lock:
+            scores = index.search(terms)
+            ranked = sorted(scores.items(), key=lambda item: (
+                -item[1], index.documents[item[0]]['summary']['candidate_name'] or '', item[0]))[:limit]
+            return [dict(index.documents[register_id]['summary'], score=round(score, 3))
+                    for register_id, score in ranked]
+
+    def status(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        index = self._index
+        return {
+            'enabled': SEARCH_INDEX_ENABLED,
+            'documents': len(index.documents) if index else 0,
+            'words': len(index.sorted_words) if index else 0,
+            'age_seconds': round(time.monotonic() - self._built_at, 1) if index else None,
+            'pending': len(self._pending),
+            'builds': self.builds,
+            'last_build_seconds': self.last_build_seconds,
+            'updates': self.updates,
+            'queries': self.queries
+        }
+
+search_index = CandidateIndex()
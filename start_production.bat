@@ -12,6 +12,9 @@ if exist venv\Scripts\activate.bat (
 REM Initialize default user
 python -c "from app import init_default_user; init_default_user()"
 
+REM Precompress static files (.gz/.br copies served instead of the originals)
+flask --app app precompress-static
+
 REM Start Gunicorn
 REM Option 1: Using config file (recommended)
 gunicorn -c gunicorn_config.py app:app
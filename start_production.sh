@@ -17,6 +17,9 @@ fi
 # Initialize default user
 python -c "from app import init_default_user; init_default_user()"
 
+# Precompress static files (.gz/.br copies served instead of the originals)
+flask --app app precompress-static
+
 # Start Gunicorn
 # Option 1: Using config file (recommended)
 gunicorn -c gunicorn_config.py app:app
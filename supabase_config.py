@@ -3,7 +3,9 @@ Supabase Configuration
 Set your Supabase credentials here or use environment variables
 """
 import os
-from supabase import create_client, Client
+import threading
+import httpx
+from supabase import create_client, Client, ClientOptions
 
 # Try to load from .env file if python-dotenv is available
 try:
@@ -17,14 +19,68 @@ except ImportError:
 SUPABASE_URL = os.getenv('SUPABASE_URL', 'YOUR_SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', 'YOUR_SUPABASE_ANON_KEY')
 
+# HTTP connection pool shared by every query made from this process
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.getenv('SUPABASE_POOL_MAX_CONNECTIONS', 10))
+SUPABASE_POOL_MAX_KEEPALIVE = int(os.getenv('SUPABASE_POOL_MAX_KEEPALIVE', 10))
+SUPABASE_POOL_KEEPALIVE_EXPIRY = float(os.getenv('SUPABASE_POOL_KEEPALIVE_EXPIRY', 60))
+
+# Per-request timeouts in seconds; keep them well below gunicorn's worker timeout
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_CONNECT_TIMEOUT', 5))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', 10))
+
 # Store original proxy settings if they exist (for potential restoration)
 _original_proxy_vars = {}
 for var in ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']:
     if var in os.environ:
         _original_proxy_vars[var] = os.environ[var]
 
+# Process-wide client, created lazily by get_supabase_client()
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
 def get_supabase_client() -> Client:
-    """Initialize and return Supabase client"""
+    """Return the shared Supabase client for this process, creating it on first use"""
+    global _client, _client_pid
+    
+    # Fast path: no locking once the client exists in this process
+    client = _client
+    if client is not None and _client_pid == os.getpid():
+        return client
+    
+    with _client_lock:
+        # A client inherited across fork() is never reused; its sockets belong to the parent
+        if _client is None or _client_pid != os.getpid():
+            _client = _create_supabase_client()
+            _client_pid = os.getpid()
+        return _client
+
+def reset_supabase_client():
+    """Forget the shared client so the next call builds a new one.
+    
+    Called from gunicorn's post_fork hook. The inherited client is dropped without
+    closing it, because closing would shut down connections the master still owns.
+    """
+    global _client, _client_pid, _client_lock
+    # The lock may have been held by another thread at fork time, so replace it
+    _client_lock = threading.Lock()
+    _client = None
+    _client_pid = None
+
+def _create_http_client() -> httpx.Client:
+    """Build the keep-alive HTTP connection pool used by the Supabase client"""
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_POOL_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+        follow_redirects=True
+    )
+
+def _create_supabase_client() -> Client:
+    """Initialize and return a new Supabase client"""
     if SUPABASE_URL == 'YOUR_SUPABASE_URL' or SUPABASE_KEY == 'YOUR_SUPABASE_ANON_KEY':
         print("\n" + "="*60)
         print("ERROR: Supabase credentials not configured!")
@@ -55,9 +111,14 @@ def get_supabase_client() -> Client:
             del os.environ[var]
     
     try:
-        # Create client with only URL and key
+        # Create client backed by our own pooled HTTP client
         # Note: Upgrade to supabase>=2.8.0 to fix proxy compatibility issues
-        client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        try:
+            options = ClientOptions(httpx_client=_create_http_client())
+        except TypeError:
+            # supabase-py releases without httpx_client still pool per client
+            options = None
+        client = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
         
         # Restore proxy variables if they were removed
         for var in proxy_vars_to_remove: